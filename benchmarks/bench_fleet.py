@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""Hermetic fleet benchmark for gits.
+
+Builds N local bare remotes and a matching repository_locations.yml under a
+temporary HOME/XDG tree, then times each gits command against it. Nothing
+touches the network or the caller's real configuration.
+
+    python benchmarks/bench_fleet.py --sizes 10,100 --output bench.json
+    python benchmarks/bench_fleet.py --sizes 10,100 --baseline benchmarks/baseline.json
+
+With --delay, remotes are spread over fake hosts and a git stand-in sleeps
+before every clone, fetch and ls-remote (the last tenth of the fleet sleeps
+SLOW_FACTOR times longer), to measure the clone/pull scheduler.
+
+With --wide, single repositories with that many tracked files (plus an ignored
+tree of IGNORED_FILES) time a status cache hit against --no-cache.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+GROUP_SIZE = 50
+VARIANTS = ("clean", "dirty", "stashed", "diverged", "behind", "large")
+LARGE_FILE_BYTES = 4 << 20
+HOSTS = 3
+SLOW_FACTOR = 20
+IGNORED_FILES = 20000
+WIDE_ROUNDS = 5
+
+STAND_IN = """#!/bin/sh
+case " $* " in
+  *" clone "*|*" fetch "*|*" ls-remote "*)
+    case "$*" in
+      *slow*) sleep {slow} ;;
+      *) sleep {fast} ;;
+    esac ;;
+esac
+exec {git} "$@"
+"""
+
+
+def git(*args, cwd=None, env=None):
+    subprocess.run(["git", *args], cwd=cwd, env=env, check=True, capture_output=True)
+
+
+class Fleet:
+    def __init__(self, root: Path, size: int, delay: float = 0.0):
+        self.root = root
+        self.size = size
+        self.delay = delay
+        self.home = root / "home"
+        self.remotes = root / "remotes"
+        self.seeds = root / "seeds"
+        self.env = {
+            **os.environ,
+            "HOME": str(self.home),
+            "XDG_CONFIG_HOME": str(root / "config"),
+            "XDG_CACHE_HOME": str(root / "cache"),
+            "XDG_DATA_HOME": str(root / "data"),
+            "XDG_STATE_HOME": str(root / "state"),
+            "XDG_RUNTIME_DIR": str(root / "run"),
+            "GIT_CONFIG_GLOBAL": str(root / "gitconfig"),
+            "GIT_CONFIG_NOSYSTEM": "1",
+            "PYTHONPATH": str(REPO_ROOT),
+        }
+        for key in ("GITS_MIRROR_DIR",):
+            self.env.pop(key, None)
+
+    def name(self, index: int) -> str:
+        slow = self.delay and index >= self.size - max(1, self.size // 10)
+        return f"{'slow' if slow else 'r'}{index:05d}"
+
+    def host(self, index: int) -> str:
+        return f"host{index % HOSTS}.bench"
+
+    def group(self, index: int) -> str:
+        return f"group{index // GROUP_SIZE:03d}"
+
+    def variant(self, index: int) -> str:
+        return VARIANTS[index % len(VARIANTS)]
+
+    def clone_path(self, index: int) -> Path:
+        return self.home / self.group(index) / self.name(index)
+
+    def build(self) -> None:
+        for d in ("home", "config/gits", "cache", "data", "state", "run", "remotes", "seeds"):
+            (self.root / d).mkdir(parents=True, exist_ok=True)
+        (self.root / "run").chmod(0o700)
+        with open(self.root / "gitconfig", "w") as f:
+            f.write("[user]\n\tname = bench\n\temail = bench@example.com\n"
+                    "[init]\n\tdefaultBranch = main\n[advice]\n\tdetachedHead = false\n")
+            # Fake hosts resolve to the local bare remotes
+            for n in range(HOSTS if self.delay else 0):
+                f.write(f'[url "file://{self.remotes}/"]\n\tinsteadOf = https://host{n}.bench/\n')
+
+        if self.delay:
+            bin_dir = self.root / "bin"
+            bin_dir.mkdir()
+            stand_in = bin_dir / "git"
+            stand_in.write_text(STAND_IN.format(
+                fast=self.delay, slow=self.delay * SLOW_FACTOR, git=shutil.which("git")))
+            stand_in.chmod(0o755)
+
+        for index in range(self.size):
+            seed = self.seeds / self.name(index)
+            seed.mkdir()
+            git("init", "-q", cwd=seed, env=self.env)
+            (seed / "README.md").write_text(f"# {self.name(index)}\n")
+            (seed / "src").mkdir()
+            for n in range(5):
+                (seed / "src" / f"mod{n}.py").write_text(f"VALUE = {n}\n" * 20)
+            (seed / "notes.txt").write_text("utf-16 notes\n" * 50, encoding="utf-16")
+            if self.variant(index) == "large":
+                (seed / "blob.bin").write_bytes(os.urandom(LARGE_FILE_BYTES))
+            git("add", "-A", cwd=seed, env=self.env)
+            git("commit", "-qm", "initial", cwd=seed, env=self.env)
+            git("clone", "-q", "--bare", str(seed), str(self.remotes / f"{self.name(index)}.git"), env=self.env)
+
+        self.write_config()
+
+    def write_config(self) -> None:
+        lines = []
+        current = None
+        for index in range(self.size):
+            group = self.group(index)
+            if group != current:
+                current = group
+                lines += [f"{group}:", f"  - root_dir: ~/{group}", "  - repositories:"]
+            url = (f"https://{self.host(index)}/{self.name(index)}.git" if self.delay
+                   else f"file://{self.remotes / self.name(index)}.git")
+            lines += [f"    - alias: {self.name(index)}", f"      url: {url}"]
+        (self.root / "config" / "gits" / "repository_locations.yml").write_text("\n".join(lines) + "\n")
+
+    def apply_variants(self) -> None:
+        """Shape the working clones after `clone` so status/pull/clean see a mixed fleet."""
+        for index in range(self.size):
+            variant = self.variant(index)
+            path = self.clone_path(index)
+            seed = self.seeds / self.name(index)
+            remote = str(self.remotes / f"{self.name(index)}.git")
+
+            if variant in ("dirty", "stashed"):
+                (path / "README.md").write_text("local edit\n")
+                (path / "scratch.txt").write_text("untracked\n")
+                (path / "build").mkdir(exist_ok=True)
+                (path / "build" / "out.o").write_bytes(b"\0" * 4096)
+                if variant == "stashed":
+                    git("stash", "-q", cwd=path, env=self.env)
+
+            if variant in ("behind", "diverged"):
+                (seed / "CHANGELOG").write_text("upstream change\n")
+                git("add", "CHANGELOG", cwd=seed, env=self.env)
+                git("commit", "-qm", "upstream", cwd=seed, env=self.env)
+                git("push", "-q", remote, "main", cwd=seed, env=self.env)
+
+            if variant == "diverged":
+                (path / "LOCAL").write_text("local commit\n")
+                git("add", "LOCAL", cwd=path, env=self.env)
+                git("commit", "-qm", "local", cwd=path, env=self.env)
+
+    def gits(self, *args) -> dict:
+        env = self.env
+        if self.delay:
+            env = {**env, "PATH": f"{self.root / 'bin'}{os.pathsep}{env['PATH']}"}
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-m", "gits.main", *args],
+            env=env,
+            cwd=self.root,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        elapsed = time.perf_counter() - start
+        if result.returncode != 0:
+            sys.stderr.write(f"gits {' '.join(args)} exited {result.returncode}\n{result.stderr}\n")
+        return {"seconds": round(elapsed, 4), "exit": result.returncode}
+
+    def remove_clones(self) -> None:
+        for index in range(self.size):
+            shutil.rmtree(self.clone_path(index), ignore_errors=True)
+
+
+# (label, gits arguments) in execution order; each step depends on the previous ones
+STEPS = (
+    ("list", ("list", "-v")),
+    ("clone", ("clone",)),
+    ("status_cold", ("status", "-v", "--refresh")),
+    ("status_warm", ("status", "-v")),
+    ("status_nocache", ("status", "-v", "--no-cache")),
+    ("stash", ("stash", "-v")),
+    ("pull", ("pull",)),
+    ("convert", ("convert", "-n")),
+    ("clean", ("clean",)),
+    ("delete", ("delete",)),
+)
+
+
+# Run against the delayed stand-in; clones are removed before each step
+SCHEDULER_STEPS = (
+    ("clone_cold", ("clone", "-j", "8")),
+    ("clone_history", ("clone", "-j", "8")),
+    ("clone_host_jobs_1", ("clone", "-j", "8", "--host-jobs", "1")),
+)
+
+
+def run_scheduler(size: int, delay: float, keep: bool) -> dict:
+    """Cold clone (config order), then longest-first from recorded durations, then one job per host."""
+    root = Path(tempfile.mkdtemp(prefix=f"gits-bench-sched-{size}-"))
+    try:
+        fleet = Fleet(root, size, delay)
+        fleet.build()
+        results = {}
+        for label, args in SCHEDULER_STEPS:
+            fleet.remove_clones()
+            results[label] = fleet.gits(*args)
+            print(f"  {size:>6} {label:<18} {results[label]['seconds']:8.3f}s", file=sys.stderr)
+        return results
+    finally:
+        if keep:
+            print(f"  fleet kept at {root}", file=sys.stderr)
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+def run_wide(files: int, keep: bool) -> dict:
+    """Best-of-WIDE_ROUNDS status with a warm cache and with --no-cache on one wide repository."""
+    root = Path(tempfile.mkdtemp(prefix=f"gits-bench-wide-{files}-"))
+    try:
+        fleet = Fleet(root, 1)
+        fleet.build()
+        fleet.gits("clone")
+        path = fleet.clone_path(0)
+        for n in range(files):
+            sub = path / "wide" / f"d{n % 100:02d}"
+            sub.mkdir(parents=True, exist_ok=True)
+            (sub / f"f{n}.txt").write_text(f"{n}\n")
+        for n in range(IGNORED_FILES):
+            sub = path / "node_modules" / f"p{n % 100:02d}"
+            sub.mkdir(parents=True, exist_ok=True)
+            (sub / f"i{n}.js").write_text("x\n")
+        (path / ".gitignore").write_text("node_modules/\n")
+        git("add", "-A", cwd=path, env=fleet.env)
+        git("commit", "-qm", "wide", cwd=path, env=fleet.env)
+
+        fleet.gits("status", "--refresh")
+        results = {}
+        for label, args in (("status_warm", ("status",)), ("status_nocache", ("status", "--no-cache"))):
+            runs = [fleet.gits(*args) for _ in range(WIDE_ROUNDS)]
+            results[label] = min(runs, key=lambda run: run["seconds"])
+            print(f"  wide{files:<6} {label:<14} {results[label]['seconds']:8.3f}s", file=sys.stderr)
+        return results
+    finally:
+        if keep:
+            print(f"  fleet kept at {root}", file=sys.stderr)
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+def run_size(size: int, keep: bool) -> dict:
+    root = Path(tempfile.mkdtemp(prefix=f"gits-bench-{size}-"))
+    try:
+        fleet = Fleet(root, size)
+        start = time.perf_counter()
+        fleet.build()
+        results = {"setup_seconds": round(time.perf_counter() - start, 2)}
+
+        for label, args in STEPS:
+            results[label] = fleet.gits(*args)
+            if label == "clone":
+                fleet.apply_variants()
+            print(f"  {size:>6} {label:<14} {results[label]['seconds']:8.3f}s", file=sys.stderr)
+        return results
+    finally:
+        if keep:
+            print(f"  fleet kept at {root}", file=sys.stderr)
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    """Return human-readable regressions of current against baseline, and cache hits slower than --no-cache."""
+    regressions = []
+    for size, steps in current["results"].items():
+        base_steps = baseline.get("results", {}).get(size, {})
+        for label, result in steps.items():
+            base = base_steps.get(label)
+            if not isinstance(result, dict) or not isinstance(base, dict):
+                continue
+            if result["exit"] != 0 and base["exit"] == 0:
+                regressions.append(f"{size} {label}: now exits {result['exit']}")
+            # Ignore sub-100ms noise; startup jitter dominates there
+            if result["seconds"] > max(base["seconds"] * (1 + tolerance), base["seconds"] + 0.1):
+                ratio = result["seconds"] / base["seconds"] if base["seconds"] else float("inf")
+                regressions.append(f"{size} {label}: {base['seconds']:.3f}s -> {result['seconds']:.3f}s ({ratio:.2f}x)")
+        # A cache hit must never cost more than going to git
+        warm, nocache = steps.get("status_warm"), steps.get("status_nocache")
+        if isinstance(warm, dict) and isinstance(nocache, dict):
+            if warm["seconds"] > max(nocache["seconds"] * (1 + tolerance), nocache["seconds"] + 0.1):
+                regressions.append(f"{size} status_warm: {warm['seconds']:.3f}s, slower than --no-cache "
+                                   f"{nocache['seconds']:.3f}s")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10,100", help="Comma-separated fleet sizes (default: 10,100).")
+    parser.add_argument("--output", "-o", type=Path, help="Write results JSON here (default: stdout).")
+    parser.add_argument("--baseline", "-b", type=Path, help="Compare against this results JSON.")
+    parser.add_argument("--tolerance", "-t", type=float, default=0.25, help="Allowed slowdown ratio (default: 0.25).")
+    parser.add_argument("--save-baseline", action="store_true", help="Write results to --baseline instead of comparing.")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated fleets for inspection.")
+    parser.add_argument("--delay", type=float, default=0.0,
+                        help="Also time the scheduler against a git stand-in sleeping this many seconds per remote call.")
+    parser.add_argument("--wide", default="",
+                        help="Comma-separated tracked-file counts of single repositories to time the status cache on.")
+    args = parser.parse_args(argv)
+
+    git_version = subprocess.run(["git", "--version"], capture_output=True, text=True).stdout.strip()
+    current = {
+        "meta": {
+            "python": platform.python_version(),
+            "git": git_version,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": {},
+    }
+    for size in (int(s) for s in args.sizes.split(",") if s):
+        current["results"][str(size)] = run_size(size, args.keep)
+        if args.delay:
+            current["results"][f"{size}-delay{args.delay:g}"] = run_scheduler(size, args.delay, args.keep)
+    for files in (int(s) for s in args.wide.split(",") if s):
+        current["results"][f"wide{files}"] = run_wide(files, args.keep)
+
+    payload = json.dumps(current, indent=2)
+    if args.output:
+        args.output.write_text(payload + "\n")
+    else:
+        print(payload)
+
+    if args.baseline and args.save_baseline:
+        args.baseline.write_text(payload + "\n")
+        return 0
+
+    if args.baseline:
+        regressions = compare(current, json.loads(args.baseline.read_text()), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+from pathlib import Path
+from typing import List, Optional
+import subprocess
+import tempfile
+import threading
+
+import typer
+import gits.ui.icons as ICONS
+from gits.ui.units import format_bytes
+from gits.utils.bundles import (
+    BundleMissing, export_bundle, extract_archive, import_bundles, load_manifest, save_manifest, write_archive,
+)
+from gits.utils.repos import filtered_repos
+from gits.utils.runner import run_parallel, echo_grouped
+
+app = typer.Typer(help="Move repositories to offline machines as git bundles.", add_completion=False)
+
+BUNDLE_DIR = Path("gits-bundles")
+
+
+@app.command()
+def export(
+    repo_group: Optional[str] = typer.Option(None, "--repo-group", "-r", help="Limit to groups (comma-separated globs)."),
+    tags: Optional[List[str]] = typer.Option(None, "--tag", help="Limit to repositories with these tags."),
+    aliases: Optional[List[str]] = typer.Option(None, "--alias", help="Limit to aliases (comma-separated globs)."),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Enable verbose output."),
+    dry_run: bool = typer.Option(False, "--dry-run", "-n", help="Run without making changes."),
+    jobs: Optional[int] = typer.Option(None, "--jobs", "-j", help="Parallel jobs (default: CPU count)."),
+    output: Path = typer.Option(BUNDLE_DIR, "--output", "-o", help="Directory holding the bundles and manifest."),
+    full: bool = typer.Option(False, "--full", help="Ignore earlier exports and bundle everything."),
+    archive: Optional[Path] = typer.Option(None, "--archive", help="Also pack the manifest and this run's bundles into a tar."),
+):
+    """Write one git bundle per repository, carrying only what changed since the last export."""
+    manifest = load_manifest(output)
+    written = []
+    lock = threading.Lock()
+
+    def export_repo(group_name, repo):
+        alias = repo.alias
+        path = repo.path
+        key = f"{group_name}/{alias}"
+        entry = manifest["repos"].get(key, {})
+
+        if not path.exists():
+            return [f"   {ICONS.WARNING} Not cloned: {alias}"] if verbose else None
+
+        if dry_run:
+            kind = "full" if full or not entry else "incremental"
+            return [f"   {ICONS.REPO} (dry-run) {kind} bundle {alias} -> {output / key}"]
+
+        try:
+            updated = export_bundle(path, output, key, entry, full)
+        except subprocess.CalledProcessError as e:
+            lines = [f"{ICONS.ERROR} Failed: {alias}"]
+            if verbose and e.stderr:
+                lines.append("\n".join(f"\t{line}" for line in e.stderr.strip().splitlines()))
+            return lines
+
+        if updated is None:
+            return [f"   {ICONS.CLEAN} Up to date: {alias}"] if verbose else None
+
+        updated, bundle = updated
+        with lock:
+            manifest["repos"][key] = updated
+            if bundle:
+                written.append(bundle["file"])
+        if bundle is None:
+            return [f"   {ICONS.REPO} Refs only: {alias}"]
+        kind = "Full" if bundle["full"] else "Incremental"
+        return [f"   {ICONS.REPO} {kind}: {alias} ({format_bytes(bundle['bytes'])})"]
+
+    echo_grouped(run_parallel(filtered_repos(repo_group, tags, aliases), export_repo, jobs), True)
+    if dry_run:
+        return
+
+    save_manifest(output, manifest)
+    if archive:
+        write_archive(archive, output, sorted(written))
+        typer.echo(f"{ICONS.DONE} Archived {len(written)} bundles to {archive}")
+    else:
+        typer.echo(f"{ICONS.DONE} Wrote {len(written)} bundles to {output}")
+
+
+@app.command("import")
+def import_(
+    source: Path = typer.Argument(BUNDLE_DIR, help="Bundle directory or tar archive written by bundle export."),
+    repo_group: Optional[str] = typer.Option(None, "--repo-group", "-r", help="Limit to groups (comma-separated globs)."),
+    tags: Optional[List[str]] = typer.Option(None, "--tag", help="Limit to repositories with these tags."),
+    aliases: Optional[List[str]] = typer.Option(None, "--alias", help="Limit to aliases (comma-separated globs)."),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Enable verbose output."),
+    dry_run: bool = typer.Option(False, "--dry-run", "-n", help="Run without making changes."),
+    jobs: Optional[int] = typer.Option(None, "--jobs", "-j", help="Parallel jobs (default: CPU count)."),
+):
+    """Clone or update repositories from exported bundles, in the layout of repository_locations.yml."""
+    if not source.exists():
+        typer.echo(f"{ICONS.ERROR} {source} not found")
+        raise typer.Exit(1)
+
+    with tempfile.TemporaryDirectory(prefix="gits-bundles-") as tmp:
+        directory = source
+        if source.is_file():
+            directory = Path(tmp)
+            extract_archive(source, directory)
+        manifest = load_manifest(directory)
+
+        def import_repo(group_name, repo):
+            alias = repo.alias
+            path = repo.path
+            entry = manifest["repos"].get(f"{group_name}/{alias}")
+
+            if not entry:
+                return [f"   {ICONS.WARNING} No bundle: {alias}"] if verbose else None
+
+            if dry_run:
+                action = "update" if path.exists() else "clone"
+                return [f"   {ICONS.CLONE} (dry-run) {action} {alias} {path}"]
+
+            try:
+                action = import_bundles(path, directory, entry, repo.url)
+            except BundleMissing as e:
+                return [f"{ICONS.ERROR} Failed: {alias}: missing {e}"]
+            except subprocess.CalledProcessError as e:
+                lines = [f"{ICONS.ERROR} Failed: {alias}"]
+                if verbose and e.stderr:
+                    lines.append("\n".join(f"\t{line}" for line in e.stderr.strip().splitlines()))
+                return lines
+
+            if action == "up_to_date":
+                return [f"   {ICONS.CLEAN} Up to date: {alias}"] if verbose else None
+            icon = ICONS.CLONE if action == "cloned" else ICONS.PULL
+            return [f"   {icon} {action.capitalize()}: {alias}"]
+
+        echo_grouped(run_parallel(filtered_repos(repo_group, tags, aliases), import_repo, jobs), True)
@@ -1,79 +1,131 @@
-from pathlib import Path
-from typing import Optional
-from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+from typing import List, Optional
 import subprocess
+import threading
 
 import typer
 import gits.ui.icons as ICONS
-from gits.utils.repos import get_repo_path, filtered_repos
+from gits.ui.output import OutputFormat, Reporter, repo_record
+from gits.ui.units import format_bytes
+from gits.utils.clean_plan import plan_clean
+from gits.utils.process import run
+from gits.utils.repos import filtered_repos
+from gits.utils.runner import run_parallel, echo_grouped
 
 def clean(
     ctx: typer.Context,
-    repo_group: Optional[str] = typer.Option(None, "--repo-group", "-r", help="Limit to a specific group."),
+    repo_group: Optional[str] = typer.Option(None, "--repo-group", "-r", help="Limit to groups (comma-separated globs)."),
+    tags: Optional[List[str]] = typer.Option(None, "--tag", help="Limit to repositories with these tags."),
+    aliases: Optional[List[str]] = typer.Option(None, "--alias", help="Limit to aliases (comma-separated globs)."),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Enable verbose output."),
     dry_run: bool = typer.Option(False, "--dry-run", "-n", help="Run without making changes."),
+    jobs: Optional[int] = typer.Option(None, "--jobs", "-j", help="Parallel jobs (default: CPU count)."),
+    output_format: OutputFormat = typer.Option(OutputFormat.text, "--format", help="Output format."),
 ):
     """Clean listed repositories by resetting and removing untracked files, including subfolders."""
-    check_group = ""
-    any_output = False
+    plans = {}
+    freed = Counter()
+    lock = threading.Lock()
 
-    for group_name, repo in filtered_repos(repo_group):
-        if repo.get("unlisted", False):
-            continue
-
-        if group_name != check_group:
-           check_group = group_name
-           if verbose:
-              typer.echo(f"{ICONS.GROUP} {group_name}")
+    # Pass 1: find out, in parallel, which repositories have anything to clean
+    def plan_repo(group_name, repo):
+        path = repo.path
+        # Skip directories that are not initialized Git repositories
+        if not (path / ".git").exists():
+            return
+        try:
+            plans[str(path)] = plan_clean(path)
+        except subprocess.CalledProcessError as e:
+            plans[str(path)] = (e.stderr or "").strip() or "is not a git repository"
 
-        any_output = False
+    # Pass 2: reset and clean only the repositories that need it
+    def clean_repo(group_name, repo):
+        alias = repo.alias
+        path = repo.path
+        plan = plans.get(str(path))
+        lines = []
 
-        alias = repo["alias"]
-        path = get_repo_path(group_name, alias, repo.get("target_path"))
+        if plan is None:
+            return None
 
-        # Skip directories that are not initialized Git repositories
-        if not (path / ".git").exists():
-            continue
+        if isinstance(plan, str):
+            if verbose:
+                lines.append(f"   {ICONS.ERROR} {alias}: is not a git repository")
+            return reporter.repo(repo_record(group_name, alias, path, "error", error=plan), lines)
 
-        if not path.exists():
+        if not (plan.needs_reset or plan.needs_clean):
             if verbose:
-                typer.echo(f"   {ICONS.WARNING} Not cloned: {alias}")
-            any_output = True
-            continue
+                lines.append(f"   {ICONS.INFO} Clean: {alias}")
+            return reporter.repo(repo_record(group_name, alias, path, "clean"), lines)
+
+        fields = {"tracked": plan.tracked, "untracked": plan.untracked, "ignored": plan.ignored,
+                  "reclaimable": plan.reclaimable}
+        with lock:
+            freed["repos"] += 1
+            freed["bytes"] += plan.reclaimable
 
         if dry_run:
-            typer.echo(f"{ICONS.CLEAN} (dry-run) would clean {alias} at {path}")
-            continue
+            lines.append(f"{ICONS.CLEAN} (dry-run) would clean {alias} at {path} "
+                         f"({plan.summary()} · {format_bytes(plan.reclaimable)})")
+            return reporter.repo(repo_record(group_name, alias, path, "dry_run", removable=plan.removable, **fields), lines)
 
         try:
-            reset = subprocess.run(
-                ["git", "-C", str(path), "reset", "--hard"],
-                capture_output=True,
-                text=True,
-                check=True,
-            )
-
-            clean = subprocess.run(
-                ["git", "-C", str(path), "clean", "-ffdx" ],
-                capture_output=True,
-                text=True,
-                check=True,
-            )
+            output = []
+            head = None
+            if plan.needs_reset:
+                reset = run(
+                    ["git", "-C", str(path), "reset", "--hard"],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                )
+                head = reset.stdout.strip()
+                output.append(reset.stdout.rstrip())
+
+            removed = []
+            if plan.needs_clean:
+                clean = run(
+                    ["git", "-C", str(path), "clean", "-ffdx" ],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                )
+                removed = [line[len("Removing "):] for line in clean.stdout.splitlines() if line.startswith("Removing ")]
+                output.append(clean.stdout.rstrip())
+
+            record = repo_record(group_name, alias, path, "cleaned", head=head, removed=removed, **fields)
 
             if verbose:
-                output = reset.stdout.rstrip() + "\n" + clean.stdout.rstrip()
-                if output:
-                    output = "\n".join(f"\t\t{line}" for line in output.splitlines())
-                    typer.echo(f"   {ICONS.CLEAN} Modified: {alias}\n{output}")
-                else:
-                    typer.echo(f"   {ICONS.INFO} Clean: {alias}")
-
-            any_output = True
-        except subprocess.CalledProcessError:
+                output = "\n".join(f"\t\t{line}" for line in "\n".join(output).splitlines() if line)
+                lines.append(f"   {ICONS.CLEAN} Modified: {alias} ({format_bytes(plan.reclaimable)} freed)\n{output}")
+        except subprocess.CalledProcessError as e:
+            record = repo_record(group_name, alias, path, "error", error=(e.stderr or "").strip() or "is not a git repository")
             if verbose:
-                typer.echo(f"   {ICONS.ERROR} {alias}: is not a git repository")
-            any_output = True
+                lines.append(f"   {ICONS.ERROR} {alias}: is not a git repository")
 
-    if not any_output:
-        typer.echo(f"   {ICONS.INFO} All repositories are clean.")
+        return reporter.repo(record, lines)
+
+    repos = [
+        (group_name, repo)
+        for group_name, repo in filtered_repos(repo_group, tags, aliases)
+        if not repo.unlisted
+    ]
 
+    for _ in run_parallel(repos, plan_repo, jobs):
+        pass
+
+    reporter = Reporter(output_format)
+    echo_grouped(run_parallel(repos, clean_repo, jobs), verbose and not reporter.structured)
+
+    if reporter.structured:
+        reporter.emit({"type": "summary", "dry_run": dry_run, "repos": freed["repos"], "reclaimable": freed["bytes"]})
+        reporter.close()
+        return
+
+    if not freed["repos"]:
+        typer.echo(f"   {ICONS.INFO} All repositories are clean.")
+    elif dry_run:
+        typer.echo(f"{ICONS.CLEAN} (dry-run) would free {format_bytes(freed['bytes'])} "
+                   f"across {freed['repos']} of {len(repos)} repositories")
+    elif verbose:
+        typer.echo(f"{ICONS.CLEAN} Freed {format_bytes(freed['bytes'])} across {freed['repos']} repositories")
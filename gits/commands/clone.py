@@ -1,49 +1,205 @@
+from collections import Counter
 from pathlib import Path
-from typing import Optional
-from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+import shutil
 import subprocess
+import threading
 
 import typer
 import gits.ui.icons as ICONS
-from gits.utils.repos import get_repo_path, filtered_repos
+from gits.ui.output import OutputFormat, Reporter, repo_record
+from gits.ui.progress import Dashboard
+from gits.utils.clone_options import clone_args, sparse_paths, validate_repo_options
+from gits.utils.git_status import read_status
+from gits.utils.gitmeta import git_dir
+from gits.utils.index import FleetIndex
+from gits.utils.journal import STARTED, Journal
+from gits.utils.mirrors import MIRROR_DIR, update_mirror
+from gits.utils.process import run
+from gits.utils.repos import filtered_repos, repo_key
+from gits.utils.retry import with_retries
+from gits.utils.runner import NETWORK_JOBS, run_parallel, echo_grouped
+from gits.utils.scheduler import DEFAULT_HOST_JOBS, DurationHistory, Scheduler, url_host
+
+def unfinished_clone(path: Path) -> bool:
+    """A git directory whose HEAD does not resolve, as a clone killed before checkout leaves it."""
+    if git_dir(path) is None:
+        return False
+    result = run(
+        ["git", "-C", str(path), "rev-parse", "--verify", "-q", "HEAD"],
+        capture_output=True,
+        text=True,
+    )
+    return result.returncode != 0
+
 
 def clone(
     ctx: typer.Context,
-    repo_group: Optional[str] = typer.Option(None, "--repo-group", "-r", help="Limit to a specific group."),
+    repo_group: Optional[str] = typer.Option(None, "--repo-group", "-r", help="Limit to groups (comma-separated globs)."),
+    tags: Optional[List[str]] = typer.Option(None, "--tag", help="Limit to repositories with these tags."),
+    aliases: Optional[List[str]] = typer.Option(None, "--alias", help="Limit to aliases (comma-separated globs)."),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Enable verbose output."),
     dry_run: bool = typer.Option(False, "--dry-run", "-n", help="Run without making changes."),
+    jobs: int = typer.Option(NETWORK_JOBS, "--jobs", "-j", help=f"Parallel jobs (default: {NETWORK_JOBS}; network-bound, so not the CPU count)."),
+    host_jobs: int = typer.Option(DEFAULT_HOST_JOBS, "--host-jobs", help="Parallel jobs per remote host."),
+    mirror: bool = typer.Option(False, "--mirror", "-m", help="Borrow objects from the local mirror cache (--reference)."),
+    mirror_dir: Path = typer.Option(MIRROR_DIR, "--mirror-dir", help="Directory holding bare mirrors."),
+    dissociate: bool = typer.Option(
+        True, "--dissociate/--no-dissociate", help="Copy borrowed objects so clones do not depend on the mirrors.",
+    ),
+    resume: bool = typer.Option(False, "--resume", help="Only clone repositories the last run did not finish."),
+    retries: int = typer.Option(2, "--retries", help="Retries for transient network failures."),
+    backoff: float = typer.Option(2.0, "--backoff", help="Seconds before the first retry; doubles each time."),
+    progress: Optional[bool] = typer.Option(None, "--progress/--no-progress", help="Live progress view (default: on a terminal)."),
+    output_format: OutputFormat = typer.Option(OutputFormat.text, "--format", help="Output format."),
 ):
     """Clone repositories listed in the YAML file."""
+    mirrors = {}
+    counts = Counter()
+    lock = threading.Lock()
+
+    def tally(key):
+        with lock:
+            counts[key] += 1
+
+    def ensure_mirror(url):
+        try:
+            path, _ = update_mirror(url, mirror_dir, fetch=False)
+            mirrors[url] = path
+        except subprocess.CalledProcessError:
+            pass
+
     def clone_repo(group_name, repo):
-        alias = repo["alias"]
-        url = repo["url"]
-        path = get_repo_path(group_name, alias, repo.get("target_path"))
+        alias = repo.alias
+        url = repo.url
+        path = repo.path
+        lines = []
+
+        if path.exists() and journal.interrupted(path) and not dry_run and unfinished_clone(path):
+            # Killed before git could clean up after itself
+            shutil.rmtree(path, ignore_errors=True)
+            lines.append(f"   {ICONS.DELETE} Removed unfinished clone: {alias}")
 
         if path.exists():
+            journal.record(path, "exists")
             if verbose:
-                typer.echo(f"   {ICONS.WARNING} Exists: {alias}")
-            return
+                lines.append(f"   {ICONS.WARNING} Exists: {alias}")
+            return reporter.repo(repo_record(group_name, alias, path, "exists", url=url), lines)
+
+        errors = validate_repo_options(repo)
+        if errors:
+            lines.append(f"{ICONS.ERROR} Invalid: {alias}: {'; '.join(errors)}")
+            return reporter.repo(repo_record(group_name, alias, path, "invalid", url=url, error="; ".join(errors)), lines)
 
         if dry_run:
-            typer.echo(f"   {ICONS.CLONE} (dry-run) clone {url} {path}")
-            return
+            lines.append(f"   {ICONS.CLONE} (dry-run) clone {url} {path}")
+            return reporter.repo(repo_record(group_name, alias, path, "dry_run", url=url), lines)
 
         path.parent.mkdir(parents=True, exist_ok=True)
+        args = ["git", "clone", "-v" if verbose else "-q", *clone_args(repo)]
+        if url in mirrors:
+            args += ["--reference", str(mirrors[url])]
+            if dissociate:
+                args.append("--dissociate")
+        if dashboard.enabled:
+            args.append("--progress")
+
+        def retrying(attempt, delay):
+            scheduler.congested(url_host(url))
+            shutil.rmtree(path, ignore_errors=True)
+            if verbose:
+                lines.append(f"   {ICONS.REFRESH} Retry {attempt}/{retries} in {delay:.1f}s: {alias}")
+
+        journal.record(path, STARTED)
         try:
+            result = with_retries(
+                lambda: dashboard.run([*args, url, str(path)], check=True),
+                retries,
+                backoff,
+                retrying,
+            )
+
             if verbose:
-                subprocess.run(["git", "clone", "-v", url, str(path)], check=True)
-            else:
-                subprocess.run(["git", "clone", "-q", url, str(path)], check=True)
+                output = (result.stdout + result.stderr).rstrip()
+                if output:
+                    lines.append(output)
 
-            typer.echo(f"   {ICONS.CLONE} Cloned: {alias}")
-        except subprocess.CalledProcessError:
+            paths = sparse_paths(repo)
+            if paths:
+                run(
+                    ["git", "-C", str(path), "sparse-checkout", "set", *paths],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                )
+
+            index.update(group_name, alias, path, read_status(path), fetched=True, measure=True)
+            lines.append(f"   {ICONS.CLONE} Cloned: {alias}")
+            record = repo_record(group_name, alias, path, "cloned", url=url, mirror=url in mirrors)
+        except subprocess.CalledProcessError as e:
+            # A clone that failed after checkout (e.g. sparse-checkout) would
+            # otherwise be skipped as "Exists" from now on
+            shutil.rmtree(path, ignore_errors=True)
+            tally("failed")
+            dashboard.failed()
+            record = repo_record(group_name, alias, path, "failed", url=url, error=(e.stderr or "").strip())
             if verbose:
-                typer.echo(f"{ICONS.ERROR} Failed: {alias}")
-
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        check_group = ""
-        for group_name, repo in filtered_repos(repo_group):
-            if group_name != check_group:
-                check_group = group_name
-                typer.echo(f"{ICONS.GROUP} {group_name}")
-            executor.submit(clone_repo, group_name, repo)
+                output = (e.stdout + e.stderr).rstrip()
+                if output:
+                    lines.append(output)
+            lines.append(f"{ICONS.ERROR} Failed: {alias}")
+
+        journal.record(path, record["state"], error=record.get("error"))
+        return reporter.repo(record, lines)
+
+    journal = Journal("clone", enabled=not dry_run, resume=resume)
+    repos = filtered_repos(repo_group, tags, aliases)
+    if resume:
+        pending = journal.pending(repos)
+        if output_format == OutputFormat.text:
+            typer.echo(f"{ICONS.INFO} Resuming: {len(repos) - len(pending)} of {len(repos)} already done")
+        repos = pending
+
+    # One mirror per unique remote, so duplicate URLs cost a single download
+    if mirror and not dry_run:
+        urls = {
+            repo.url
+            for group_name, repo in repos
+            if repo.url and not repo.path.exists()
+        }
+        for _ in run_parallel([(url,) for url in sorted(urls)], ensure_mirror, jobs):
+            pass
+        if mirrors and not dissociate and output_format == OutputFormat.text:
+            typer.echo(
+                f"{ICONS.WARNING} New clones borrow objects from {mirror_dir}; "
+                "deleting or pruning those mirrors will break them."
+            )
+
+    reporter = Reporter(output_format)
+    index = FleetIndex()
+    def clone_key(group_name, repo):
+        # Existing checkouts finish instantly and say nothing about clone time
+        key = repo_key(repo)
+        return None if Path(key).exists() else key
+
+    history = DurationHistory("clone")
+    scheduler = Scheduler(jobs, host_jobs, history)
+    dashboard = Dashboard(ICONS.CLONE, len(repos), Dashboard.wanted(progress, reporter.structured))
+    with dashboard:
+        echo_grouped(
+            scheduler.run(
+                repos,
+                dashboard.track(clone_repo, lambda group_name, repo: repo.alias),
+                host_of=lambda group_name, repo: url_host(repo.url),
+                key_of=clone_key,
+            ),
+            not reporter.structured,
+            dashboard.echo,
+        )
+    index.save()
+    journal.close()
+    if not dry_run:
+        history.save()
+    reporter.close()
+    if counts["failed"] and not reporter.structured:
+        typer.echo(f"{ICONS.ERROR} {counts['failed']} failed; rerun with gits clone --resume")
@@ -1,44 +1,104 @@
-from typing import Optional
-from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import List, Optional
+import time
 
 import typer
 import gits.ui.icons as ICONS
-from gits.utils.repos import get_repo_path, filtered_repos
+from gits.ui.units import format_bytes
+from gits.utils.encoding import convert_files, iter_files
+from gits.utils.repos import iter_repos
+from gits.utils.runner import default_jobs, echo_grouped
+
+# Files per process-pool task, and tasks in flight per worker
+BATCH_FILES = 32
+BATCHES_PER_JOB = 4
+
+
+def _batches(files, size: int):
+    while True:
+        batch = list(islice(files, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _run_now(fn, *args) -> Future:
+    future = Future()
+    future.set_result(fn(*args))
+    return future
+
 
 def convert(
     ctx: typer.Context,
-    repo_group: Optional[str] = typer.Option(None, "--repo-group", "-r", help="Limit to a specific group."),
+    repo_group: Optional[str] = typer.Option(None, "--repo-group", "-r", help="Limit to groups (comma-separated globs)."),
+    tags: Optional[List[str]] = typer.Option(None, "--tag", help="Limit to repositories with these tags."),
+    aliases: Optional[List[str]] = typer.Option(None, "--alias", help="Limit to aliases (comma-separated globs)."),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Enable verbose output."),
     dry_run: bool = typer.Option(False, "--dry-run", "-n", help="Run without making changes."),
+    jobs: Optional[int] = typer.Option(None, "--jobs", "-j", help="Worker processes (default: CPU count)."),
+    ignore: Optional[List[str]] = typer.Option(None, "--ignore", "-i", help="Glob of files or directories to skip; repeatable."),
 ):
     """Convert UTF-16 files to UTF-8 in all repositories."""
-    def convert_repo(group_name, repo):
-        alias = repo["alias"]
-        path = get_repo_path(group_name, alias, repo.get("target_path"))
+    jobs = jobs or default_jobs()
+    ignores = tuple(ignore or ())
+    totals = {"scanned": 0, "converted": 0, "bytes": 0}
 
-        if not path.exists():
+    def report(repo, futures):
+        lines = []
+        if futures is None:
             if verbose:
-                typer.echo(f"   {ICONS.CONVERT} {alias}: not cloned")
-            return
+                lines.append(f"   {ICONS.CONVERT} {repo.alias}: not cloned")
+            return lines
 
-        for file in path.rglob("*"):
-            try:
-                with open(file, "r", encoding="utf-16") as f:
-                    content = f.read()
-                if dry_run:
-                    typer.echo(f"   {ICONS.CONVERT} (dry-run) would convert {file}")
+        for future in futures:
+            for result in future.result():
+                totals["scanned"] += 1
+                totals["bytes"] += result.bytes_read
+                if result.encoding is None:
                     continue
-                with open(file, "w", encoding="utf-8") as f:
-                    f.write(content)
-                if verbose:
-                    typer.echo(f"   {ICONS.CONVERT} Converted: {file}")
-            except UnicodeError:
-                continue
-
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        check_group = ""
-        for group_name, repo in filtered_repos(repo_group):
-            if group_name != check_group:
-                check_group = group_name
-                typer.echo(f"{ICONS.GROUP} {group_name}")
-            executor.submit(convert_repo, group_name, repo)
+                if dry_run:
+                    lines.append(f"   {ICONS.CONVERT} (dry-run) would convert {result.path}")
+                elif result.converted:
+                    totals["converted"] += 1
+                    if verbose:
+                        lines.append(f"   {ICONS.CONVERT} Converted: {result.path}")
+        return lines
+
+    def converted(submit, window: int):
+        """Walk repositories in order, feeding file batches to submit; yield each repo's lines in order."""
+        pending = deque()
+        in_flight = deque()
+        for group_name, repo in iter_repos(repo_group, tags, aliases):
+            futures = [] if repo.path.exists() else None
+            pending.append((group_name, repo, futures))
+            if futures is not None:
+                for batch in _batches(iter_files(str(repo.path), ignores), BATCH_FILES):
+                    # Wait for the oldest batch rather than queueing the whole tree
+                    while len(in_flight) >= window:
+                        in_flight.popleft().result()
+                    future = submit(convert_files, batch, dry_run)
+                    futures.append(future)
+                    in_flight.append(future)
+            while len(pending) > 1 and all(f.done() for f in pending[0][2] or ()):
+                group_name, done_repo, done_futures = pending.popleft()
+                yield (group_name, done_repo), report(done_repo, done_futures)
+        while pending:
+            group_name, done_repo, done_futures = pending.popleft()
+            yield (group_name, done_repo), report(done_repo, done_futures)
+
+    start = time.perf_counter()
+    if jobs > 1:
+        # The only pool: workers fork from this single-threaded process
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            echo_grouped(converted(pool.submit, jobs * BATCHES_PER_JOB), True)
+    else:
+        echo_grouped(converted(_run_now, 1), True)
+
+    elapsed = max(time.perf_counter() - start, 1e-6)
+    typer.echo(
+        f"{ICONS.CONVERT} Scanned {totals['scanned']} files, converted {totals['converted']}, "
+        f"{format_bytes(totals['bytes'])} read in {elapsed:.2f}s "
+        f"({format_bytes(totals['bytes'] / elapsed)}/s, {totals['scanned'] / elapsed:.0f} files/s)"
+    )
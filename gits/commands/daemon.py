@@ -0,0 +1,56 @@
+from typing import Optional
+import time
+
+import typer
+import gits.ui.icons as ICONS
+from gits.utils.daemon_client import SOCKET_PATH, request
+
+app = typer.Typer(help="Run a background watcher that keeps fleet status hot.", add_completion=False)
+
+
+@app.command()
+def start(
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Enable verbose output."),
+    jobs: Optional[int] = typer.Option(None, "--jobs", "-j", help="Parallel jobs (default: CPU count)."),
+    poll: bool = typer.Option(False, "--poll", help="Poll fingerprints instead of using inotify."),
+    interval: float = typer.Option(2.0, "--interval", help="Seconds between polls of unwatched repositories."),
+):
+    """Watch every listed repository and serve status over a Unix socket (runs in the foreground)."""
+    from gits.utils.daemon import DaemonRunning, StatusDaemon
+
+    def log(message):
+        if verbose:
+            typer.echo(f"   {ICONS.INFO} {time.strftime('%H:%M:%S')} {message}")
+
+    daemon = StatusDaemon(poll_interval=interval, use_inotify=not poll, jobs=jobs, log=log)
+    try:
+        daemon.serve(on_ready=lambda: typer.echo(
+            f"{ICONS.STATUS} Daemon: listening on {SOCKET_PATH} ({daemon.watcher.mode})"))
+    except DaemonRunning as e:
+        typer.echo(f"   {ICONS.ERROR} {e}")
+        raise typer.Exit(1)
+    except KeyboardInterrupt:
+        pass
+    typer.echo(f"   {ICONS.DONE} Daemon stopped.")
+
+
+@app.command()
+def stop():
+    """Stop a running daemon."""
+    if request({"op": "shutdown"}) is None:
+        typer.echo(f"   {ICONS.INFO} No daemon is running.")
+        return
+    typer.echo(f"   {ICONS.DONE} Daemon stopping.")
+
+
+@app.command("status")
+def daemon_status():
+    """Show whether the daemon is running and what it is watching."""
+    info = request({"op": "ping"})
+    if info is None:
+        typer.echo(f"   {ICONS.INFO} No daemon is running.")
+        raise typer.Exit(1)
+    typer.echo(f"   {ICONS.SUCCESS} Daemon pid {info['pid']} on {SOCKET_PATH} ({info['mode']}), up {info['uptime']}s")
+    typer.echo(f"   {ICONS.REPO} {info['repos']} repositories: {info['watched']} watched "
+               f"({info['watches']} inotify watches), {info['polled']} polled")
+    typer.echo(f"   {ICONS.TIME} {info['queries']} queries, {info['refreshes']} refreshes")
@@ -1,40 +1,45 @@
 import os
 import shutil
-from typing import Optional
+from typing import List, Optional
 
 import typer
 
 import gits.ui.icons as ICONS
-from gits.utils.repos import get_repo_path
-from gits.utils.config_loader import load_repos
+from gits.utils.repos import get_repo_path, selected_groups
+from gits.utils.index import FleetIndex
+from gits.utils.trash import move_to_trash, purge as trash_purge, purge_in_background
 
 def delete(
     ctx: typer.Context,
-    repo_group: Optional[str] = typer.Option(None, "--repo-group", "-r", help="Limit to a specific group."),
+    repo_group: Optional[str] = typer.Option(None, "--repo-group", "-r", help="Limit to groups (comma-separated globs)."),
+    tags: Optional[List[str]] = typer.Option(None, "--tag", help="Limit to repositories with these tags."),
+    aliases: Optional[List[str]] = typer.Option(None, "--alias", help="Limit to aliases (comma-separated globs)."),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Enable verbose output."),
     dry_run: bool = typer.Option(False, "--dry-run", "-n", help="Run without making changes."),
+    trash: bool = typer.Option(False, "--trash", "-t", help="Move repositories to the trash and reclaim space in the background."),
+    purge: bool = typer.Option(False, "--purge", help="Reclaim space held by the trash before returning."),
+    jobs: Optional[int] = typer.Option(None, "--jobs", "-j", help="Parallel removal jobs (default: CPU count)."),
 ):
     """Delete repositories listed in YAML that are not protected by do_not_delete."""
-    repos = load_repos()
     deleted = []
+    trashed = []
+    index = FleetIndex()
 
-    for group in repos:
-        group_name = group["group_name"]
-        if repo_group and group_name != repo_group:
-            continue
+    for group, repos in selected_groups(repo_group, tags, aliases):
+        group_name = group.name
 
         typer.echo(f"{ICONS.GROUP} {group_name}")
 
-        for repo in group["repositories"]:
-            alias = repo["alias"]
+        for repo in repos:
+            alias = repo.alias
 
-            do_not_delete = repo.get("do_not_delete", False)
-            target_path = get_repo_path(group_name, alias, repo.get("target_path"))
+            do_not_delete = repo.do_not_delete
+            target_path = repo.path
 
             if not target_path.exists():
                 continue
 
-            if repo.get("unlisted", False):
+            if repo.unlisted:
                 if verbose:
                     typer.echo(f"   {ICONS.INFO} Skipped: {alias} -> {target_path} -> unlisted")
                 continue
@@ -51,7 +56,12 @@ def delete(
                 else:
                     typer.echo(f"   {ICONS.DELETE} (dry-run) would remove: {alias}")
             else:
-                shutil.rmtree(target_path)
+                moved = move_to_trash(target_path) if trash else None
+                if moved:
+                    trashed.append(moved)
+                else:
+                    shutil.rmtree(target_path)
+                index.remove(target_path)
                 if verbose:
                     typer.echo(f"   {ICONS.DELETE} Deleted: {alias} -> {target_path}")
                 else:
@@ -75,6 +85,19 @@ def delete(
         else:
             typer.echo(f"   {ICONS.WARNING} Not Empty: {group_name} -> {group_root}")
 
+    index.save()
+
     if not deleted and verbose:
         typer.echo(f"   {ICONS.INFO} No repositories deleted.")
 
+    if purge and not dry_run:
+        removed = trash_purge(
+            jobs, on_wait=lambda: typer.echo(f"   {ICONS.INFO} Waiting for the purge already running to finish"),
+        )
+        if verbose:
+            typer.echo(f"   {ICONS.DELETE} Purged: {removed} trash entries")
+    elif trashed:
+        purge_in_background()
+        if verbose:
+            typer.echo(f"   {ICONS.INFO} Reclaiming {len(trashed)} repositories in the background")
+
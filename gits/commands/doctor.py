@@ -1,60 +1,78 @@
-from pathlib import Path
 import shutil
 import sys
 import platform
-from typing import Optional
+from typing import List, Optional
 import typer
 
 from gits.utils.config_loader import CONFIG_FILE
 
 import gits.ui.icons as ICONS
+from gits.ui.output import OutputFormat, Reporter, repo_record
+from gits.utils.clone_options import CLONE_KEYS, validate_repo_options
 from gits.utils.repos import filtered_repos
 
 def doctor(
-    repo_group: Optional[str] = typer.Option(None, "--repo-group", "-r", help="Limit to a specific group.")
+    repo_group: Optional[str] = typer.Option(None, "--repo-group", "-r", help="Limit to groups (comma-separated globs)."),
+    tags: Optional[List[str]] = typer.Option(None, "--tag", help="Limit to repositories with these tags."),
+    aliases: Optional[List[str]] = typer.Option(None, "--alias", help="Limit to aliases (comma-separated globs)."),
+    output_format: OutputFormat = typer.Option(OutputFormat.text, "--format", help="Output format."),
 ):
     """Run environment and configuration checks for gits."""
-    typer.echo(f"{ICONS.DOC} Running system diagnostics.")
+    reporter = Reporter(output_format)
+
+    def echo(line):
+        if not reporter.structured:
+            typer.echo(line)
+
+    def check(name, ok, passed, failed, detail=None):
+        reporter.emit({"type": "check", "name": name, "ok": ok, "detail": detail})
+        echo(f"   {ICONS.SUCCESS} {passed}" if ok else f"   {ICONS.ERROR} {failed}")
+
+    echo(f"{ICONS.DOC} Running system diagnostics.")
 
     # Check Python version
     python_version = sys.version_info
-    if python_version >= (3, 8):
-        typer.echo(f"   {ICONS.SUCCESS} Python >= 3.8: {platform.python_version()}")
-    else:
-        typer.echo(f"   {ICONS.ERROR} Python >= 3.8 required. Found: {platform.python_version()}")
+    check("python", python_version >= (3, 8),
+          f"Python >= 3.8: {platform.python_version()}",
+          f"Python >= 3.8 required. Found: {platform.python_version()}",
+          platform.python_version())
 
     # Check if git is installed
-    if shutil.which("git"):
-        typer.echo(f"   {ICONS.SUCCESS} git found in PATH")
-    else:
-        typer.echo(f"   {ICONS.ERROR} git not found in PATH")
+    git = shutil.which("git")
+    check("git", bool(git), "git found in PATH", "git not found in PATH", git)
 
     # Check config file
-    if CONFIG_FILE.exists():
-        typer.echo(f"   {ICONS.SUCCESS} {CONFIG_FILE} found")
-    else:
-        typer.echo(f"   {ICONS.ERROR} {CONFIG_FILE} missing")
+    check("config", CONFIG_FILE.exists(), f"{CONFIG_FILE} found", f"{CONFIG_FILE} missing", str(CONFIG_FILE))
 
     # Load and check filtered repos
     try:
-        groups = list(filtered_repos(repo_group))
-        typer.echo(f"{ICONS.GROUP} {repo_group}")
-        typer.echo(f"   {ICONS.SUCCESS} Repos: {len(groups)}")
+        groups = list(filtered_repos(repo_group, tags, aliases))
+        echo(f"{ICONS.GROUP} {repo_group}")
+        echo(f"   {ICONS.SUCCESS} Repos: {len(groups)}")
     except Exception as e:
-        typer.echo(f"{ICONS.ERROR} Failed to parse repository config: {e}")
+        reporter.emit({"type": "check", "name": "parse", "ok": False, "detail": str(e)})
+        echo(f"{ICONS.ERROR} Failed to parse repository config: {e}")
+        reporter.close()
         return
 
     # Check each repo
     for group_name, repo in groups:
-        alias = repo["alias"]
+        alias = repo.alias
+        path = repo.path
+        errors = validate_repo_options(repo)
+        if reporter.structured:
+            state = "invalid" if errors else ("ok" if path.parent.exists() else "missing_parent")
+            options = {key: repo.get(key) for key in CLONE_KEYS if repo.get(key) is not None}
+            reporter.emit(repo_record(group_name, alias, path, state, options=options, errors=errors))
+            continue
+
         typer.echo(f"   {ICONS.SUCCESS} Alias: {alias}")
 
-        if repo.get("target_path"):
+        if repo.target_path:
             typer.echo(f"      {ICONS.INFO} root_dir: True")
         else:
             typer.echo(f"      {ICONS.INFO} Target_path: True")
 
-        path = Path(repo.get("target_path") or Path.home() / group_name / alias)
         if path.parent.exists():
             typer.echo(f"      {ICONS.INFO} path: {path}")
         else:
@@ -65,4 +83,11 @@ def doctor(
         else:
             typer.echo(f"      {ICONS.WARNING} Not Found: {path.parent}")
 
-    typer.echo(f"{ICONS.DOC} Diagnostics complete.")
+        for key in CLONE_KEYS:
+            if repo.get(key) is not None:
+                typer.echo(f"      {ICONS.INFO} {key}: {repo.get(key)}")
+        for error in errors:
+            typer.echo(f"      {ICONS.ERROR} {error}")
+
+    echo(f"{ICONS.DOC} Diagnostics complete.")
+    reporter.close()
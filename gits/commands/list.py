@@ -1,28 +1,42 @@
-from typing import Optional
+from typing import List, Optional
 
 import typer
 import gits.ui.icons as ICONS
+from gits.ui.output import OutputFormat, Reporter, repo_record
 
-from gits.utils.config_loader import load_repos
+from gits.utils.repos import selected_groups
 
 def list(
     ctx: typer.Context,
-    repo_group: Optional[str] = typer.Option(None, "--repo-group", "-r", help="Limit to a specific group."),
+    repo_group: Optional[str] = typer.Option(None, "--repo-group", "-r", help="Limit to groups (comma-separated globs)."),
+    tags: Optional[List[str]] = typer.Option(None, "--tag", help="Limit to repositories with these tags."),
+    aliases: Optional[List[str]] = typer.Option(None, "--alias", help="Limit to aliases (comma-separated globs)."),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="List repositories instead of just groups."),
+    output_format: OutputFormat = typer.Option(OutputFormat.text, "--format", help="Output format."),
 ):
     """List repository groups and optionally their repositories."""
-    repos = load_repos()
-    for group in repos:
-        group_name = group["group_name"]
-        if repo_group and group_name != repo_group:
+    reporter = Reporter(output_format)
+    for group, repos in selected_groups(repo_group, tags, aliases):
+        group_name = group.name
+
+        if reporter.structured:
+            for repo in repos:
+                path = repo.path
+                reporter.emit(repo_record(
+                    group_name, repo.alias, path,
+                    "unlisted" if repo.unlisted else "listed",
+                    url=repo.url, root_dir=group.root_dir,
+                ))
             continue
 
         typer.echo(f"{ICONS.GROUP} {group_name}")
 
         if verbose:
-            for repo in group["repositories"]:
-                if not isinstance(repo, dict) or "alias" not in repo or "url" not in repo:
+            for repo in repos:
+                if repo.url is None:
                     continue
-                alias = repo["alias"]
-                url = repo["url"]
+                alias = repo.alias
+                url = repo.url
                 typer.echo(f"   {ICONS.REPO} {alias} -> {url}")
+
+    reporter.close()
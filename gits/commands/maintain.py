@@ -0,0 +1,109 @@
+from collections import Counter
+from contextlib import nullcontext
+from typing import List, Optional
+import subprocess
+import threading
+import time
+
+import typer
+import gits.ui.icons as ICONS
+from gits.ui.output import OutputFormat, Reporter, repo_record
+from gits.ui.units import format_bytes
+from gits.utils.maintenance import HEAVY_TASKS, count_objects, plan_maintenance
+from gits.utils.process import run
+from gits.utils.repos import iter_repos
+from gits.utils.runner import run_parallel, echo_grouped
+
+
+def maintain(
+    ctx: typer.Context,
+    repo_group: Optional[str] = typer.Option(None, "--repo-group", "-r", help="Limit to groups (comma-separated globs)."),
+    tags: Optional[List[str]] = typer.Option(None, "--tag", help="Limit to repositories with these tags."),
+    aliases: Optional[List[str]] = typer.Option(None, "--alias", help="Limit to aliases (comma-separated globs)."),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Enable verbose output."),
+    dry_run: bool = typer.Option(False, "--dry-run", "-n", help="Run without making changes."),
+    jobs: Optional[int] = typer.Option(None, "--jobs", "-j", help="Parallel jobs (default: CPU count)."),
+    io_jobs: int = typer.Option(2, "--io-jobs", help="Repacks allowed to run at the same time."),
+    max_loose: int = typer.Option(1000, "--max-loose", help="Loose objects tolerated before gc."),
+    max_packs: int = typer.Option(20, "--max-packs", help="Packs tolerated before gc."),
+    max_loose_refs: int = typer.Option(500, "--max-loose-refs", help="Loose refs tolerated before pack-refs."),
+    output_format: OutputFormat = typer.Option(OutputFormat.text, "--format", help="Output format."),
+):
+    """Measure object storage in every repository and gc or pack refs where thresholds are exceeded."""
+    io_slots = threading.BoundedSemaphore(max(1, io_jobs))
+    counts = Counter()
+    lock = threading.Lock()
+
+    def tally(**amounts):
+        with lock:
+            counts.update(amounts)
+
+    def maintain_repo(group_name, repo):
+        alias = repo.alias
+        path = repo.path
+        lines = []
+
+        if not (path / ".git").exists():
+            return None
+
+        try:
+            before = count_objects(path)
+            task = plan_maintenance(before, max_loose, max_packs, max_loose_refs)
+            fields = {"loose": before.loose, "packs": before.packs, "loose_refs": before.loose_refs,
+                      "bytes": before.total_bytes}
+            tally(measured=1)
+
+            if task is None:
+                if verbose:
+                    lines.append(f"   {ICONS.CLEAN} Healthy: {alias} ({before.loose} loose, {before.packs} packs, "
+                                 f"{format_bytes(before.total_bytes)})")
+                return reporter.repo(repo_record(group_name, alias, path, "healthy", **fields), lines)
+
+            reason = f"{before.loose} loose, {before.packs} packs, {before.loose_refs} loose refs"
+            if dry_run:
+                lines.append(f"   {ICONS.REFRESH} (dry-run) would run git {' '.join(task)}: {alias} ({reason})")
+                return reporter.repo(repo_record(group_name, alias, path, "dry_run", task=task[0], **fields), lines)
+
+            # Heavy repacks queue for an I/O slot; cheap ref packing does not
+            with io_slots if task[0] in HEAVY_TASKS else nullcontext():
+                start = time.perf_counter()
+                run(["git", "-C", str(path), *task], capture_output=True, text=True, check=True)
+                seconds = time.perf_counter() - start
+
+            after = count_objects(path)
+            reclaimed = before.total_bytes - after.total_bytes
+            tally(maintained=1, reclaimed=max(reclaimed, 0))
+            lines.append(f"   {ICONS.REFRESH} Maintained: {alias} (git {task[0]}, {reason}; "
+                         f"reclaimed {format_bytes(max(reclaimed, 0))} in {seconds:.1f}s)")
+            record = repo_record(group_name, alias, path, "maintained", task=task[0], reclaimed=reclaimed,
+                                 seconds=round(seconds, 3), **fields)
+        except subprocess.CalledProcessError as e:
+            tally(failed=1)
+            lines.append(f"{ICONS.ERROR} Failed: {alias}")
+            if verbose and e.stderr:
+                lines.append("\n".join(f"\t{line}" for line in e.stderr.strip().splitlines()))
+            record = repo_record(group_name, alias, path, "failed", error=(e.stderr or "").strip())
+
+        return reporter.repo(record, lines)
+
+    repos = (
+        (group_name, repo)
+        for group_name, repo in iter_repos(repo_group, tags, aliases)
+        if not repo.unlisted
+    )
+
+    start = time.perf_counter()
+    reporter = Reporter(output_format)
+    echo_grouped(run_parallel(repos, maintain_repo, jobs), verbose and not reporter.structured)
+    elapsed = time.perf_counter() - start
+
+    if reporter.structured:
+        reporter.emit({"type": "summary", "measured": counts["measured"], "maintained": counts["maintained"],
+                       "failed": counts["failed"], "reclaimed": counts["reclaimed"], "seconds": round(elapsed, 3)})
+        reporter.close()
+        return
+
+    typer.echo(
+        f"{ICONS.TIME} Maintained {counts['maintained']} of {counts['measured']} repositories, "
+        f"reclaimed {format_bytes(counts['reclaimed'])} in {elapsed:.1f}s"
+    )
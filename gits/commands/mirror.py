@@ -0,0 +1,62 @@
+from pathlib import Path
+from typing import List, Optional
+import subprocess
+
+import typer
+import gits.ui.icons as ICONS
+from gits.utils.mirrors import MIRROR_DIR, mirror_path, update_mirror
+from gits.utils.repos import filtered_repos
+from gits.utils.runner import NETWORK_JOBS, run_parallel
+
+app = typer.Typer(help="Manage the local mirror cache used by clone --mirror.", add_completion=False)
+
+
+def unique_urls(repo_group: Optional[str], tags=None, aliases=None):
+    urls = {}
+    for _, repo in filtered_repos(repo_group, tags, aliases):
+        if repo.url:
+            urls.setdefault(repo.url, None)
+    return list(urls)
+
+
+@app.command()
+def update(
+    repo_group: Optional[str] = typer.Option(None, "--repo-group", "-r", help="Limit to groups (comma-separated globs)."),
+    tags: Optional[List[str]] = typer.Option(None, "--tag", help="Limit to repositories with these tags."),
+    aliases: Optional[List[str]] = typer.Option(None, "--alias", help="Limit to aliases (comma-separated globs)."),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Enable verbose output."),
+    dry_run: bool = typer.Option(False, "--dry-run", "-n", help="Run without making changes."),
+    jobs: int = typer.Option(NETWORK_JOBS, "--jobs", "-j", help=f"Parallel jobs (default: {NETWORK_JOBS}; network-bound, so not the CPU count)."),
+    mirror_dir: Path = typer.Option(MIRROR_DIR, "--mirror-dir", help="Directory holding bare mirrors."),
+):
+    """Create or refresh one bare mirror per unique repository URL."""
+    def update_url(url):
+        if dry_run:
+            return f"   {ICONS.REFRESH} (dry-run) mirror {url} {mirror_path(url, mirror_dir)}"
+        try:
+            path, action = update_mirror(url, mirror_dir)
+        except subprocess.CalledProcessError as e:
+            return f"   {ICONS.ERROR} Failed: {url}\n\t{e.stderr.strip()}" if verbose else f"   {ICONS.ERROR} Failed: {url}"
+        if verbose:
+            return f"   {ICONS.REFRESH} {action.capitalize()}: {url} -> {path}"
+        return None
+
+    urls = unique_urls(repo_group, tags, aliases)
+    typer.echo(f"{ICONS.REFRESH} Mirrors: {len(urls)} unique remotes")
+    for _, line in run_parallel([(url,) for url in urls], update_url, jobs):
+        if line:
+            typer.echo(line)
+
+
+@app.command("list")
+def list_mirrors(
+    repo_group: Optional[str] = typer.Option(None, "--repo-group", "-r", help="Limit to groups (comma-separated globs)."),
+    tags: Optional[List[str]] = typer.Option(None, "--tag", help="Limit to repositories with these tags."),
+    aliases: Optional[List[str]] = typer.Option(None, "--alias", help="Limit to aliases (comma-separated globs)."),
+    mirror_dir: Path = typer.Option(MIRROR_DIR, "--mirror-dir", help="Directory holding bare mirrors."),
+):
+    """Show the mirror path for every unique repository URL."""
+    for url in unique_urls(repo_group, tags, aliases):
+        path = mirror_path(url, mirror_dir)
+        icon = ICONS.SUCCESS if path.exists() else ICONS.WARNING
+        typer.echo(f"   {icon} {url} -> {path}")
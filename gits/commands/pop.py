@@ -1,43 +1,35 @@
-from typing import Optional
+from typing import List, Optional
 import subprocess
 
 import typer
 import gits.ui.icons as ICONS
-from gits.utils.repos import get_repo_path, filtered_repos
+from gits.utils.process import run
+from gits.utils.repos import iter_repos
+from gits.utils.runner import run_parallel, echo_grouped
 
 
 def pop(
     ctx: typer.Context,
-    repo_group: Optional[str] = typer.Option(None, "--repo-group", "-r", help="Limit to a specific group."),
+    repo_group: Optional[str] = typer.Option(None, "--repo-group", "-r", help="Limit to groups (comma-separated globs)."),
+    tags: Optional[List[str]] = typer.Option(None, "--tag", help="Limit to repositories with these tags."),
+    aliases: Optional[List[str]] = typer.Option(None, "--alias", help="Limit to aliases (comma-separated globs)."),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Enable verbose output."),
     dry_run: bool = typer.Option(False, "--dry-run", "-n", help="Run without making changes."),
+    jobs: Optional[int] = typer.Option(None, "--jobs", "-j", help="Parallel jobs (default: CPU count)."),
 ):
     """Pop stashed entries in all repositories."""
-    check_group = ""
-    any_output = False
-
-    for group_name, repo in filtered_repos(repo_group):
-        if repo.get("unlisted", False):
-            continue
-
-        if group_name != check_group:
-           check_group = group_name
-           if verbose:
-              typer.echo(f"{ICONS.GROUP} {group_name}")
-
-        any_output = False
-
-        alias = repo["alias"]
-        path = get_repo_path(group_name, alias, repo.get("target_path"))
+    def pop_repo(group_name, repo):
+        alias = repo.alias
+        path = repo.path
+        lines = []
 
         if not path.exists():
             if verbose:
-                typer.echo(f"   {ICONS.WARNING} Not cloned: {alias}")
-            any_output = True
-            continue
+                lines.append(f"   {ICONS.WARNING} Not cloned: {alias}")
+            return lines
 
         try:
-            pop = subprocess.run(
+            pop = run(
                 ["git", "-C", str(path), "stash", "pop"],
                 capture_output=True,
                 text=True,
@@ -48,16 +40,22 @@ def pop(
                 output = pop.stdout.rstrip()
                 if output:
                     output = "\n".join(f"\t{line}" for line in output.splitlines())
-                    typer.echo(f"   {ICONS.INFO} Poped: {alias}\n{output}")
+                    lines.append(f"   {ICONS.INFO} Poped: {alias}\n{output}")
                 else:
-                    typer.echo(f"   {ICONS.CLEAN} Clean: {alias}")
-
-            any_output = True
+                    lines.append(f"   {ICONS.CLEAN} Clean: {alias}")
         except subprocess.CalledProcessError:
             if verbose:
-                typer.echo(f"   {ICONS.ERROR} {alias}: is not a git repository")
-            any_output = True
+                lines.append(f"   {ICONS.ERROR} {alias}: is not a git repository")
+
+        return lines
+
+    repos = (
+        (group_name, repo)
+        for group_name, repo in iter_repos(repo_group, tags, aliases)
+        if not repo.unlisted
+    )
+
+    any_output = echo_grouped(run_parallel(repos, pop_repo, jobs), verbose)
 
     if not any_output:
         typer.echo(f"   {ICONS.INFO} All repositories are clean.")
-
@@ -1,54 +1,246 @@
-from typing import Optional
-from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+from typing import List, Optional
 import subprocess
+import threading
 
 import typer
 import gits.ui.icons as ICONS
-from gits.utils.repos import get_repo_path, filtered_repos
+from gits.ui.output import OutputFormat, Reporter, repo_record
+from gits.ui.progress import Dashboard
+from gits.utils.clone_options import fetch_args, sparse_paths
+from gits.utils.git_remote import ahead_behind, ls_remote, read_tracking
+from gits.utils.git_status import read_status
+from gits.utils.gitmeta import git_dir, sparse_dirs
+from gits.utils.index import FleetIndex
+from gits.utils.journal import Journal
+from gits.utils.process import run
+from gits.utils.repos import filtered_repos, repo_key
+from gits.utils.retry import with_retries
+from gits.utils.runner import NETWORK_JOBS, run_parallel, echo_grouped
+from gits.utils.scheduler import DEFAULT_HOST_JOBS, DurationHistory, Scheduler, url_host
 
 def pull(
     ctx: typer.Context,
-    repo_group: Optional[str] = typer.Option(None, "--repo-group", "-r", help="Limit to a specific group."),
+    repo_group: Optional[str] = typer.Option(None, "--repo-group", "-r", help="Limit to groups (comma-separated globs)."),
+    tags: Optional[List[str]] = typer.Option(None, "--tag", help="Limit to repositories with these tags."),
+    aliases: Optional[List[str]] = typer.Option(None, "--alias", help="Limit to aliases (comma-separated globs)."),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Enable verbose output."),
     dry_run: bool = typer.Option(False, "--dry-run", "-n", help="Run without making changes."),
+    jobs: int = typer.Option(NETWORK_JOBS, "--jobs", "-j", help=f"Parallel jobs (default: {NETWORK_JOBS}; network-bound, so not the CPU count)."),
+    host_jobs: int = typer.Option(DEFAULT_HOST_JOBS, "--host-jobs", help="Parallel jobs per remote host."),
+    resume: bool = typer.Option(False, "--resume", help="Only pull repositories the last run did not finish."),
+    retries: int = typer.Option(2, "--retries", help="Retries for transient network failures."),
+    backoff: float = typer.Option(2.0, "--backoff", help="Seconds before the first retry; doubles each time."),
+    progress: Optional[bool] = typer.Option(None, "--progress/--no-progress", help="Live progress view (default: on a terminal)."),
+    output_format: OutputFormat = typer.Option(OutputFormat.text, "--format", help="Output format."),
 ):
     """Pull changes for all repositories including unlisted ones."""
-    def pull_repo(group_name, repo):
-        alias = repo["alias"]
-        path = get_repo_path(group_name, alias, repo.get("target_path"))
+    plans = {}
+    remote_heads = {}
+    counts = Counter()
+    lock = threading.Lock()
+
+    def tally(key):
+        with lock:
+            counts[key] += 1
 
+    # Stage 1: read local branch, upstream and dirtiness
+    def inspect_repo(group_name, repo):
+        path = repo.path
         if not path.exists():
-            if verbose:
-                typer.echo(f"   {ICONS.PULL} Not pulled: {alias}")
             return
-
-        if dry_run:
-            typer.echo(f"   {ICONS.PULL} (dry-run) {alias}: would stash and pull")
+        try:
+            status = read_status(path)
+        except subprocess.CalledProcessError:
+            plans[str(path)] = {"error": "is not a git repository"}
             return
+        plans[str(path)] = {"status": status, "tracking": read_tracking(path, status.branch)}
 
+    # Stage 2: one ls-remote per unique URL for every ref we track on it
+    def query_remote(url, refs):
         try:
+            remote_heads[url] = ls_remote(url, refs)
+        except subprocess.CalledProcessError:
+            remote_heads[url] = None
+
+    # Stage 3: fetch and fast-forward what is out of date
+    def pull_repo(group_name, repo):
+        alias = repo.alias
+        path = repo.path
+        plan = plans.get(str(path))
+        lines = []
+
+        def done(state, **fields):
+            journal.record(path, state, **fields)
+            return reporter.repo(repo_record(group_name, alias, path, state, **fields), lines)
+
+        if plan is None:
+            if verbose:
+                lines.append(f"   {ICONS.PULL} Not pulled: {alias}")
+            index.remove(path)
+            return done("not_cloned")
+
+        if "error" in plan:
+            tally("failed")
+            dashboard.failed()
+            lines.append(f"{ICONS.ERROR} Failed: {alias} {plan['error']}")
+            return done("failed", error=plan["error"])
+
+        status, tracking = plan["status"], plan["tracking"]
+        if tracking is None:
+            tally("skipped")
+            if verbose:
+                lines.append(f"   {ICONS.INFO} No upstream: {alias}")
+            return done("no_upstream", branch=status.branch)
+
+        heads = remote_heads.get(tracking.url)
+        remote_sha = heads.get(tracking.remote_ref) if heads else None
+        if remote_sha and remote_sha == tracking.upstream_sha and status.behind == 0:
+            # The remote check counts as a fetch for staleness: nothing was missing
+            index.update(group_name, alias, path, status, checked=True, measure=True)
+            tally("skipped")
             if verbose:
-                git_cmd = "git stash && git pull"
-            else:
-                git_cmd = "git stash -q && git pull -q"
-
-            subprocess.run(
-                ["bash", "-c", git_cmd],
-                cwd=path,
-                check=True
+                lines.append(f"   {ICONS.PULL} Up to date: {alias}")
+            return done("up_to_date", fetched=False, checked=True)
+
+        if dry_run:
+            lines.append(f"   {ICONS.PULL} (dry-run) {alias}: would fetch and fast-forward")
+            return done("dry_run")
+
+        stashed = False
+        fetched = False
+
+        try:
+            # A current tracking ref that is merely ahead of HEAD needs no fetch
+            if remote_sha is None or remote_sha != tracking.upstream_sha:
+                refspec = [tracking.remote_ref] if repo.get("single_branch") else []
+
+                def retrying(attempt, delay):
+                    scheduler.congested(url_host(tracking.url))
+                    if verbose:
+                        lines.append(f"   {ICONS.REFRESH} Retry {attempt}/{retries} in {delay:.1f}s: {alias}")
+
+                progress_arg = ["--progress"] if dashboard.enabled else []
+                with_retries(
+                    lambda: dashboard.run(
+                        ["git", "-C", str(path), "fetch", "-q", *progress_arg, *fetch_args(repo), tracking.remote, *refspec],
+                        check=True,
+                    ),
+                    retries,
+                    backoff,
+                    retrying,
+                )
+                fetched = True
+
+            ahead, behind = ahead_behind(path, tracking.upstream)
+            if behind == 0:
+                index.update(group_name, alias, path, read_status(path), fetched=fetched, measure=True)
+                tally("skipped")
+                if verbose:
+                    lines.append(f"   {ICONS.PULL} Up to date: {alias}")
+                return done("up_to_date", fetched=fetched, ahead=ahead)
+
+            if ahead:
+                index.update(group_name, alias, path, read_status(path), fetched=fetched, measure=True)
+                tally("diverged")
+                lines.append(f"   {ICONS.WARNING} Diverged: {alias} (↑{ahead} ↓{behind})")
+                return done("diverged", ahead=ahead, behind=behind)
+
+            if status.staged or status.unstaged or status.conflicts:
+                run(
+                    ["git", "-C", str(path), "stash", "-q"],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                )
+                tally("stashed")
+                stashed = True
+                if verbose:
+                    lines.append(f"   {ICONS.STASH} Stashed: {alias}")
+
+            run(
+                ["git", "-C", str(path), "merge", "-q", "--ff-only", tracking.upstream],
+                capture_output=True,
+                text=True,
+                check=True,
             )
 
+            # Keep the checkout in step with the sparse paths in the YAML, now that
+            # the worktree is clean and current
+            paths = sparse_paths(repo)
+            if paths and sparse_dirs(git_dir(path)) != sorted(p.strip("/") for p in paths):
+                run(
+                    ["git", "-C", str(path), "sparse-checkout", "set", *paths],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                )
+            index.update(group_name, alias, path, read_status(path), fetched=fetched, measure=True)
+            tally("fast_forwarded")
             if verbose:
-                typer.echo(f"   {ICONS.PULL} Pulled: {alias}")
-        except subprocess.CalledProcessError:
-            typer.echo(f"{ICONS.ERROR} Failed: {alias}")
+                lines.append(f"   {ICONS.PULL} Pulled: {alias} (↓{behind})")
+            return done("fast_forwarded", behind=behind, stashed=stashed)
+        except subprocess.CalledProcessError as e:
+            tally("failed")
+            dashboard.failed()
+            lines.append(f"{ICONS.ERROR} Failed: {alias}")
+            if verbose and e.stderr:
+                lines.append("\n".join(f"\t{line}" for line in e.stderr.strip().splitlines()))
+            return done("failed", error=(e.stderr or "").strip(), stashed=stashed)
+
+    journal = Journal("pull", enabled=not dry_run, resume=resume)
+    repos = filtered_repos(repo_group, tags, aliases)
+    if resume:
+        pending = journal.pending(repos)
+        if output_format == OutputFormat.text:
+            typer.echo(f"{ICONS.INFO} Resuming: {len(repos) - len(pending)} of {len(repos)} already done")
+        repos = pending
+    for _ in run_parallel(repos, inspect_repo, jobs):
+        pass
+
+    refs_by_url = {}
+    for plan in plans.values():
+        tracking = plan.get("tracking")
+        if tracking and tracking.upstream_sha:
+            refs_by_url.setdefault(tracking.url, set()).add(tracking.remote_ref)
+    history = DurationHistory("pull")
+    scheduler = Scheduler(jobs, host_jobs, history)
+    for _ in scheduler.run(refs_by_url.items(), query_remote, host_of=lambda url, refs: url_host(url)):
+        pass
+
+    def pull_host(group_name, repo):
+        # Throttle by the remote the fetch really goes to; unlisted repos have no YAML url
+        plan = plans.get(str(repo.path)) or {}
+        tracking = plan.get("tracking")
+        return url_host(tracking.url if tracking else repo.url)
 
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        check_group = ""
-        for group_name, repo in filtered_repos(repo_group):
-            if group_name != check_group:
-                check_group = group_name
-                if verbose or dry_run:
-                    typer.echo(f"{ICONS.GROUP} {group_name}")
-            executor.submit(pull_repo, group_name, repo)
+    reporter = Reporter(output_format)
+    index = FleetIndex()
+    dashboard = Dashboard(ICONS.PULL, len(repos), Dashboard.wanted(progress, reporter.structured))
+    with dashboard:
+        echo_grouped(
+            scheduler.run(
+                repos,
+                dashboard.track(pull_repo, lambda group_name, repo: repo.alias),
+                host_of=pull_host,
+                key_of=lambda group_name, repo: repo_key(repo),
+            ),
+            (verbose or dry_run) and not reporter.structured,
+            dashboard.echo,
+        )
+    index.save()
+    journal.close()
+    if not dry_run:
+        history.save()
 
+    if reporter.structured:
+        keys = ("skipped", "fast_forwarded", "stashed", "diverged", "failed")
+        reporter.emit({"type": "summary", **{key: counts[key] for key in keys}})
+        reporter.close()
+    elif verbose or counts["failed"] or counts["diverged"]:
+        typer.echo(
+            f"{ICONS.PULL} Skipped {counts['skipped']}, fast-forwarded {counts['fast_forwarded']}, "
+            f"stashed {counts['stashed']}, diverged {counts['diverged']}, failed {counts['failed']}"
+        )
+    if counts["failed"] and not reporter.structured:
+        typer.echo(f"{ICONS.ERROR} {counts['failed']} failed; rerun with gits pull --resume")
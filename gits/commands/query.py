@@ -0,0 +1,85 @@
+from pathlib import Path
+from typing import List, Optional
+import time
+
+import typer
+import gits.ui.icons as ICONS
+from gits.ui.output import OutputFormat, Reporter, repo_record
+from gits.ui.units import format_bytes
+from gits.utils.disk import disk_usage
+from gits.utils.index import INDEX_FILE, query as query_index, row_status, update_sizes
+from gits.utils.repos import selected_paths
+from gits.utils.runner import run_parallel
+
+
+def _age(timestamp: Optional[float]) -> str:
+    if timestamp is None:
+        return "never fetched"
+    days = (time.time() - timestamp) / 86400
+    if days < 1:
+        return f"fetched {days * 24:.0f}h ago"
+    return f"fetched {days:.0f}d ago"
+
+
+def query(
+    ctx: typer.Context,
+    repo_group: Optional[str] = typer.Option(None, "--repo-group", "-r", help="Limit to groups (comma-separated globs)."),
+    tags: Optional[List[str]] = typer.Option(None, "--tag", help="Limit to repositories with these tags."),
+    aliases: Optional[List[str]] = typer.Option(None, "--alias", help="Limit to aliases (comma-separated globs)."),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Show path, size and last fetch."),
+    dirty: bool = typer.Option(False, "--dirty", help="Repositories with staged, unstaged, untracked or conflicted files."),
+    stashed: bool = typer.Option(False, "--stashed", help="Repositories with stash entries."),
+    behind: bool = typer.Option(False, "--behind", help="Repositories behind their upstream."),
+    ahead: bool = typer.Option(False, "--ahead", help="Repositories ahead of their upstream."),
+    stale_days: Optional[float] = typer.Option(None, "--stale-days", help="Repositories not fetched for N days."),
+    refresh_size: bool = typer.Option(False, "--refresh-size", help="Measure disk usage of the matching repositories first."),
+    jobs: Optional[int] = typer.Option(None, "--jobs", "-j", help="Parallel jobs for --refresh-size (default: CPU count)."),
+    output_format: OutputFormat = typer.Option(OutputFormat.text, "--format", help="Output format."),
+):
+    """Answer questions about the fleet from the local index without running git."""
+    reporter = Reporter(output_format)
+    if not INDEX_FILE.exists():
+        message = "No index yet; run gits status to build it."
+        if reporter.structured:
+            reporter.emit({"type": "error", "message": message})
+            reporter.close()
+        else:
+            typer.echo(f"   {ICONS.INFO} {message}")
+        raise typer.Exit(1)
+
+    def matching():
+        rows = query_index(dirty=dirty, stashed=stashed, behind=behind, ahead=ahead, stale_days=stale_days)
+        if repo_group or tags or aliases:
+            paths = set(selected_paths(repo_group, tags, aliases))
+            rows = [row for row in rows if row["path"] in paths]
+        return rows
+
+    rows = matching()
+    if refresh_size and rows:
+        measured = run_parallel([(row["path"],) for row in rows], lambda path: disk_usage(Path(path)), jobs)
+        update_sizes({path: size for (path,), size in measured})
+        rows = matching()
+
+    check_group = ""
+    for row in rows:
+        status = row_status(row)
+        if reporter.structured:
+            reporter.emit(repo_record(
+                row["group_name"], row["alias"], row["path"], "modified" if status.modified else "clean",
+                **{key: row[key] for key in row.keys() if key not in ("path", "group_name", "alias")},
+            ))
+            continue
+
+        if row["group_name"] != check_group:
+            check_group = row["group_name"]
+            typer.echo(f"{ICONS.GROUP} {check_group}")
+        icon = ICONS.INFO if status.modified else ICONS.CLEAN
+        line = f"   {icon} {row['alias']} ({status.summary()})"
+        if verbose:
+            size = format_bytes(row["size_bytes"]) if row["size_bytes"] is not None else "size unknown"
+            line += f" · {size} · {_age(row['last_fetch'])} -> {row['path']}"
+        typer.echo(line)
+
+    reporter.close()
+    if not rows and not reporter.structured:
+        typer.echo(f"   {ICONS.INFO} No repositories match.")
@@ -1,63 +1,61 @@
-from typing import Optional
-import subprocess
+from typing import List, Optional
 
 import typer
 import gits.ui.icons as ICONS
-from gits.utils.repos import get_repo_path, filtered_repos
+from gits.ui.output import OutputFormat, Reporter, repo_record
+from gits.utils.gitmeta import git_dir, is_repository, stash_entries
+from gits.utils.repos import iter_repos
+from gits.utils.runner import run_parallel, echo_grouped
 
 
 def stash(
     ctx: typer.Context,
-    repo_group: Optional[str] = typer.Option(None, "--repo-group", "-r", help="Limit to a specific group."),
+    repo_group: Optional[str] = typer.Option(None, "--repo-group", "-r", help="Limit to groups (comma-separated globs)."),
+    tags: Optional[List[str]] = typer.Option(None, "--tag", help="Limit to repositories with these tags."),
+    aliases: Optional[List[str]] = typer.Option(None, "--alias", help="Limit to aliases (comma-separated globs)."),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Enable verbose output."),
     dry_run: bool = typer.Option(False, "--dry-run", "-n", help="Run without making changes."),
+    jobs: Optional[int] = typer.Option(None, "--jobs", "-j", help="Parallel jobs (default: CPU count)."),
+    output_format: OutputFormat = typer.Option(OutputFormat.text, "--format", help="Output format."),
 ):
     """Print stashed entries in all repositories."""
-    check_group = ""
-    any_output = False
+    def stash_repo(group_name, repo):
+        alias = repo.alias
+        path = repo.path
+        lines = []
 
-    for group_name, repo in filtered_repos(repo_group):
-        if repo.get("unlisted", False):
-            continue
+        if not path.exists():
+            if verbose:
+                lines.append(f"   {ICONS.WARNING} Not cloned: {alias}")
+            return reporter.repo(repo_record(group_name, alias, path, "not_cloned"), lines)
 
-        if group_name != check_group:
-           check_group = group_name
-           if verbose:
-              typer.echo(f"{ICONS.GROUP} {group_name}")
+        if not is_repository(path):
+            if verbose:
+                lines.append(f"   {ICONS.ERROR} {alias}: is not a git repository")
+            return reporter.repo(repo_record(group_name, alias, path, "error", error="is not a git repository"), lines)
 
-        any_output = False
+        # Read straight from the stash reflog; no git process per repository
+        entries = stash_entries(git_dir(path))
+        record = repo_record(group_name, alias, path, "stashed" if entries else "clean", stashes=entries)
 
-        alias = repo["alias"]
-        path = get_repo_path(group_name, alias, repo.get("target_path"))
+        if verbose:
+            if entries:
+                output = "\n".join(f"\t{line}" for line in entries)
+                lines.append(f"   {ICONS.INFO} Stash: {alias}\n{output}")
+            else:
+                lines.append(f"   {ICONS.CLEAN} Clean: {alias}")
 
-        if not path.exists():
-            if verbose:
-                typer.echo(f"   {ICONS.WARNING} Not cloned: {alias}")
-            any_output = True
-            continue
-
-        try:
-            pop = subprocess.run(
-                ["git", "-C", str(path), "stash", "list"],
-                capture_output=True,
-                text=True,
-                check=True,
-            )
+        return reporter.repo(record, lines)
 
-            if verbose:
-                output = pop.stdout.rstrip()
-                if output:
-                    output = "\n".join(f"\t{line}" for line in output.splitlines())
-                    typer.echo(f"   {ICONS.INFO} Stash: {alias}\n{output}")
-                else:
-                    typer.echo(f"   {ICONS.CLEAN} Clean: {alias}")
-
-            any_output = True
-        except subprocess.CalledProcessError:
-            if verbose:
-                typer.echo(f"   {ICONS.ERROR} {alias}: is not a git repository")
-            any_output = True
+    repos = (
+        (group_name, repo)
+        for group_name, repo in iter_repos(repo_group, tags, aliases)
+        if not repo.unlisted
+    )
 
-    if not any_output:
-        typer.echo(f"   {ICONS.INFO} All repositories are clean.")
+    reporter = Reporter(output_format)
+    any_output = echo_grouped(run_parallel(repos, stash_repo, jobs), verbose and not reporter.structured)
+    reporter.close()
 
+    if not any_output and not reporter.structured:
+        typer.echo(f"   {ICONS.INFO} All repositories are clean.")
@@ -1,70 +1,93 @@
-from typing import Optional
+from dataclasses import asdict
+from typing import List, Optional
 import subprocess
 
 import typer
 import gits.ui.icons as ICONS
-from gits.utils.repos import get_repo_path, filtered_repos
+from gits.ui.output import OutputFormat, Reporter, repo_record
+from gits.utils.daemon_client import query_status
+from gits.utils.git_status import RepoStatus, read_status
+from gits.utils.index import FleetIndex
+from gits.utils.repos import filtered_repos
+from gits.utils.runner import run_parallel, echo_grouped
+from gits.utils.status_cache import StatusCache
 
 
 def status(
     ctx: typer.Context,
-    repo_group: Optional[str] = typer.Option(None, "--repo-group", "-r", help="Limit to a specific group."),
+    repo_group: Optional[str] = typer.Option(None, "--repo-group", "-r", help="Limit to groups (comma-separated globs)."),
+    tags: Optional[List[str]] = typer.Option(None, "--tag", help="Limit to repositories with these tags."),
+    aliases: Optional[List[str]] = typer.Option(None, "--alias", help="Limit to aliases (comma-separated globs)."),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Enable verbose output."),
     dry_run: bool = typer.Option(False, "--dry-run", "-n", help="Run without making changes."),
+    jobs: Optional[int] = typer.Option(None, "--jobs", "-j", help="Parallel jobs (default: CPU count)."),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Do not read or write the status cache."),
+    refresh: bool = typer.Option(False, "--refresh", help="Ignore cached results and rebuild the cache."),
+    no_daemon: bool = typer.Option(False, "--no-daemon", help="Do not ask a running gits daemon."),
+    output_format: OutputFormat = typer.Option(OutputFormat.text, "--format", help="Output format."),
 ):
     """Print git status for all repositories."""
-    check_group = ""
-    any_output = False
-
-    for group_name, repo in filtered_repos(repo_group):
-        if repo.get("unlisted", False):
-            continue
-
-        if group_name != check_group:
-           check_group = group_name
-           if verbose:
-              typer.echo(f"{ICONS.GROUP} {group_name}")
-
-        any_output = False
-
-        alias = repo["alias"]
-        path = get_repo_path(group_name, alias, repo.get("target_path"))
+    def status_repo(group_name, repo):
+        alias = repo.alias
+        path = repo.path
+        lines = []
 
         if not path.exists():
             if verbose:
-                typer.echo(f"   {ICONS.WARNING} Not cloned: {alias}")
-            any_output = True
-            continue
+                lines.append(f"   {ICONS.WARNING} Not cloned: {alias}")
+            index.remove(path)
+            return reporter.repo(repo_record(group_name, alias, path, "not_cloned"), lines)
 
         try:
-            status = subprocess.run(
-                ["git", "-C", str(path), "status", "--short", "--untracked"],
-                capture_output=True,
-                text=True,
-                check=True,
-            )
-
-            stash = subprocess.run(
-                ["git", "-C", str(path), "stash", "list" ],
-                capture_output=True,
-                text=True,
-                check=True,
-            )
+            answer = answers.get(str(path), {})
+            if "status" in answer:
+                result = RepoStatus(**answer["status"])
+            else:
+                result = cache.lookup(path, read_status)
+            index.update(group_name, alias, path, result)
+            state = "modified" if result.modified else "clean"
+            record = repo_record(group_name, alias, path, state, **asdict(result))
 
             if verbose:
-                output = status.stdout.rstrip() + stash.stdout.rstrip()
-                if output:
-                    output = "\n".join(f"\t{line}" for line in output.splitlines())
-                    typer.echo(f"   {ICONS.INFO} Modified: {alias}\n{output}")
+                if result.modified:
+                    lines.append(f"   {ICONS.INFO} Modified: {alias} ({result.summary()})")
                 else:
-                    typer.echo(f"   {ICONS.CLEAN} Clean: {alias}")
-
-            any_output = True
-        except subprocess.CalledProcessError:
+                    lines.append(f"   {ICONS.CLEAN} Clean: {alias} ({result.summary()})")
+        except subprocess.CalledProcessError as e:
+            record = repo_record(group_name, alias, path, "error", error=(e.stderr or "").strip() or "is not a git repository")
             if verbose:
-                typer.echo(f"   {ICONS.ERROR} {alias}: is not a git repository")
-            any_output = True
+                lines.append(f"   {ICONS.ERROR} {alias}: is not a git repository")
+
+        return reporter.repo(record, lines)
+
+    repos = [
+        (group_name, repo)
+        for group_name, repo in filtered_repos(repo_group, tags, aliases)
+        if not repo.unlisted
+    ]
+
+    reporter = Reporter(output_format)
+    cache = StatusCache(enabled=not no_cache, refresh=refresh)
+    index = FleetIndex()
+
+    answers = None
+    if not (no_daemon or no_cache or refresh):
+        answers = query_status(
+            repo.path for group_name, repo in repos
+        )
+    daemon_used = answers is not None
+    answers = answers or {}
+    any_output = echo_grouped(run_parallel(repos, status_repo, jobs), verbose and not reporter.structured)
+    cache.save()
+    index.save()
+    reporter.close()
+    if reporter.structured:
+        return
+
+    if verbose and daemon_used:
+        typer.echo(f"   {ICONS.INFO} Daemon: {len(answers)} answered, {len(repos) - len(answers)} computed")
+    elif verbose and cache.enabled:
+        typer.echo(f"   {ICONS.INFO} Cache: {cache.hits} hits, {cache.misses} misses")
 
     if not any_output:
         typer.echo(f"   {ICONS.INFO} All repositories are clean.")
-
@@ -1,53 +1,133 @@
-import sys
+import importlib
 import typer
-from typing import Optional
-
-from gits.commands.clean import clean
-from gits.commands.clone import clone
-from gits.commands.convert import convert
-from gits.commands.delete import delete
-from gits.commands.doctor import doctor
-from gits.commands.list import list
-from gits.commands.pull import pull
-from gits.commands.stash import stash
-from gits.commands.pop import pop
-from gits.commands.status import status
-
-app = typer.Typer(help="Manage git repositories defined in YAML configuration.")
-
-known_commands = {
-    "clean",
-    "clone",
-    "convert",
-    "delete",
-    "doctor",
-    "list",
-    "pop",
-    "pull",
-    "stash",
-    "status"
-    }
-
-# Register each command
-app.command()(clean)
-app.command()(clone)
-app.command()(convert)
-app.command()(delete)
-app.command()(doctor)
-app.command()(list)
-app.command()(pop)
-app.command()(pull)
-app.command()(stash)
-app.command()(status)
+import typer.core
+from pathlib import Path
+from typing import List, Optional
+
+from gits.utils import profiler
+
+# Commands are imported on first use so `gits --help` and shell prompt
+# integrations only pay for the command that actually runs.
+# name -> (module, attribute: a command function or a typer.Typer sub-app)
+COMMANDS = {
+    "bundle": ("gits.commands.bundle", "app"),
+    "clean": ("gits.commands.clean", "clean"),
+    "clone": ("gits.commands.clone", "clone"),
+    "convert": ("gits.commands.convert", "convert"),
+    "daemon": ("gits.commands.daemon", "app"),
+    "delete": ("gits.commands.delete", "delete"),
+    "doctor": ("gits.commands.doctor", "doctor"),
+    "list": ("gits.commands.list", "list"),
+    "maintain": ("gits.commands.maintain", "maintain"),
+    "mirror": ("gits.commands.mirror", "app"),
+    "pop": ("gits.commands.pop", "pop"),
+    "pull": ("gits.commands.pull", "pull"),
+    "query": ("gits.commands.query", "query"),
+    "stash": ("gits.commands.stash", "stash"),
+    "status": ("gits.commands.status", "status"),
+}
+
+known_commands = set(COMMANDS)
+
+
+def load_command(name: str):
+    module_name, attr = COMMANDS[name]
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def short_help(name: str) -> str:
+    """First line of a command's docstring, or of its sub-app's help=, read from source without importing it."""
+    import ast
+
+    module_name, attr = COMMANDS[name]
+    source = Path(__file__).parent.parent / f"{module_name.replace('.', '/')}.py"
+    try:
+        tree = ast.parse(source.read_text())
+    except OSError:
+        return ""
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name == attr:
+            text = ast.get_docstring(node) or ""
+        elif isinstance(node, ast.Assign) and any(getattr(target, "id", None) == attr for target in node.targets):
+            keywords = getattr(node.value, "keywords", [])
+            text = next((k.value.value for k in keywords if k.arg == "help" and isinstance(k.value, ast.Constant)), "")
+        else:
+            continue
+        return text.strip().split("\n")[0]
+    return ""
+
+
+class LazyGroup(typer.core.TyperGroup):
+    """Typer group that imports a command module only when it is resolved."""
+
+    _listing = False
+
+    def list_commands(self, ctx):
+        # Resolved commands are also in self.commands
+        return sorted({*super().list_commands(ctx), *COMMANDS})
+
+    def get_command(self, ctx, cmd_name):
+        command = super().get_command(ctx, cmd_name)
+        if command is not None or cmd_name not in COMMANDS:
+            return command
+
+        if self._listing:
+            return typer.core.TyperCommand(name=cmd_name, short_help=short_help(cmd_name))
+
+        target = load_command(cmd_name)
+        if not isinstance(target, typer.Typer):
+            sub = typer.Typer(add_completion=False)
+            sub.command(name=cmd_name)(target)
+            target = sub
+
+        command = typer.main.get_command(target)
+        command.name = cmd_name
+        self.commands[cmd_name] = command
+        return command
+
+    def format_help(self, ctx, formatter):
+        # Listing commands in --help only needs their names and short help
+        self._listing = True
+        try:
+            return super().format_help(ctx, formatter)
+        finally:
+            self._listing = False
+
+
+app = typer.Typer(cls=LazyGroup, help="Manage git repositories defined in YAML configuration.")
 
 @app.callback(invoke_without_command=True)
 def default_command(
     ctx: typer.Context,
     repo_group: Optional[str] = typer.Option(None, "--repo-group", "-r"),
+    tags: Optional[List[str]] = typer.Option(None, "--tag"),
+    aliases: Optional[List[str]] = typer.Option(None, "--alias"),
     verbose: bool = typer.Option(False, "--verbose", "-v"),
     dry_run: bool = typer.Option(False, "--dry-run", "-n"),
+    jobs: Optional[int] = typer.Option(None, "--jobs", "-j"),
+    startup_profile: bool = typer.Option(False, "--startup-profile",
+                                         help="Report where startup time goes, then exit."),
+    profile: bool = typer.Option(False, "--profile",
+                                 help="Record every git subprocess and print the slowest repositories."),
+    profile_out: Path = typer.Option(Path("gits-trace.json"), "--profile-out",
+                                     help="Chrome trace-event JSON written by --profile."),
+    profile_top: int = typer.Option(10, "--profile-top", help="Repositories listed by --profile."),
 ):
-    args = [arg for arg in sys.argv[1:] if not arg.startswith("-")]
-    if not args or args[0] not in known_commands:
-        status(ctx=ctx, repo_group=repo_group, verbose=verbose, dry_run=dry_run)
+    if startup_profile:
+        from gits.utils.startup import profile_startup
+        profile_startup()
+        raise typer.Exit()
+
+    if profile:
+        profiler.enable()
+        ctx.call_on_close(lambda: profiler.finish(
+            profile_out, profile_top, f"gits {ctx.invoked_subcommand or 'status'}"))
+
+    if ctx.invoked_subcommand is None:
+        status = load_command("status")
+        status(ctx=ctx, repo_group=repo_group, tags=tags, aliases=aliases, verbose=verbose, dry_run=dry_run, jobs=jobs,
+               no_cache=False, refresh=False, no_daemon=False, output_format="text")
+
 
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,58 @@
+# gits/ui/output.py
+# Note usage:  reporter = Reporter(output_format); return reporter.repo(record, lines).
+import json
+import threading
+from enum import Enum
+from pathlib import Path
+from typing import List, Optional
+
+import typer
+
+
+class OutputFormat(str, Enum):
+    text = "text"
+    json = "json"
+    ndjson = "ndjson"
+
+
+def repo_record(group_name: str, alias: str, path: Optional[Path], state: str, **fields) -> dict:
+    record = {"type": "repo", "group": group_name, "alias": alias, "path": str(path) if path else None, "state": state}
+    record.update(fields)
+    return record
+
+
+class Reporter:
+    """Route per-repo results to human text, a JSON array or NDJSON lines.
+
+    In ndjson mode each record is written the moment its worker finishes, so
+    downstream tools can start on early results.
+    """
+
+    def __init__(self, output_format: OutputFormat = OutputFormat.text):
+        self.output_format = output_format
+        self._lock = threading.Lock()
+        self._records = []
+
+    @property
+    def structured(self) -> bool:
+        return self.output_format != OutputFormat.text
+
+    def emit(self, record: dict) -> None:
+        if self.output_format == OutputFormat.ndjson:
+            line = json.dumps(record, default=str, ensure_ascii=False)
+            with self._lock:
+                typer.echo(line)
+        elif self.output_format == OutputFormat.json:
+            with self._lock:
+                self._records.append(record)
+
+    def repo(self, record: dict, lines: Optional[List[str]]) -> Optional[List[str]]:
+        """Emit record in structured modes; otherwise hand back the text lines."""
+        if not self.structured:
+            return lines
+        self.emit(record)
+        return None
+
+    def close(self) -> None:
+        if self.output_format == OutputFormat.json:
+            typer.echo(json.dumps(self._records, default=str, ensure_ascii=False, indent=2))
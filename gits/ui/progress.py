@@ -0,0 +1,187 @@
+# gits/ui/progress.py
+# Note usage:  dashboard = Dashboard(ICONS.CLONE, len(repos), enabled); with dashboard: ...
+import re
+import shutil
+import sys
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import typer
+from gits.ui.units import format_bytes
+from gits.utils.process import run, run_progress
+
+# Redraws per second; updates in between only mark the view dirty
+REFRESH_HZ = 10
+
+_PROGRESS = re.compile(
+    r"^(?:remote: )?(?P<phase>[A-Za-z ]+):\s+(?P<percent>\d+)% \(\d+/\d+\)"
+    r"(?:, (?P<size>[\d.]+) (?P<unit>bytes|KiB|MiB|GiB))?"
+)
+_UNITS = {"bytes": 1, "KiB": 1 << 10, "MiB": 1 << 20, "GiB": 1 << 30}
+
+
+def parse_progress(line: str) -> Optional[Tuple[str, int, Optional[int]]]:
+    """(phase, percent, bytes received so far) from one git --progress line."""
+    match = _PROGRESS.match(line)
+    if not match:
+        return None
+    size = match.group("size")
+    received = int(float(size) * _UNITS[match.group("unit")]) if size else None
+    return match.group("phase"), int(match.group("percent")), received
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds // 3600}h{seconds // 60 % 60:02d}m"
+
+
+class _Task:
+    __slots__ = ("label", "phase", "percent", "received")
+
+    def __init__(self, label: str):
+        self.label = label
+        self.phase = "starting"
+        self.percent = 0
+        self.received = 0
+
+
+class Dashboard:
+    """Live view of in-flight repositories for clone and pull on a terminal.
+
+    Workers wrapped by track() report progress for their own repository;
+    the view redraws from a background thread at most REFRESH_HZ times a
+    second and only when something changed. Result lines printed through
+    echo() scroll above it. When disabled, echo() is typer.echo and the
+    rest does nothing, so output is the same as without the view.
+    """
+
+    def __init__(self, icon: str, total: int, enabled: bool):
+        self.icon = icon
+        self.total = total
+        self.enabled = enabled
+        self.completed = 0
+        self.failures = 0
+        self._received = 0
+        self._tasks: Dict[int, _Task] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._drawn = 0
+        self._start = time.perf_counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def wanted(progress: Optional[bool], structured: bool) -> bool:
+        """--progress/--no-progress if given, else only when stdout is a terminal."""
+        if structured:
+            return False
+        return progress if progress is not None else sys.stdout.isatty()
+
+    def __enter__(self):
+        if self.enabled:
+            self._start = time.perf_counter()
+            self._thread = threading.Thread(target=self._refresh, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self._thread:
+            self._stop.set()
+            self._thread.join()
+            with self._lock:
+                self._clear()
+                sys.stdout.flush()
+        return False
+
+    def track(self, worker: Callable, label_of: Callable[..., str]) -> Callable:
+        """Wrap worker so each call shows as an in-flight task while it runs."""
+        if not self.enabled:
+            return worker
+
+        def tracked(*item):
+            task = _Task(label_of(*item))
+            key = threading.get_ident()
+            self._local.failed = False
+            with self._lock:
+                self._tasks[key] = task
+                self._dirty = True
+            try:
+                return worker(*item)
+            finally:
+                with self._lock:
+                    del self._tasks[key]
+                    self._received += task.received
+                    self.completed += 1
+                    self.failures += self._local.failed
+                    self._dirty = True
+
+        return tracked
+
+    def progress(self, line: str) -> None:
+        parsed = parse_progress(line)
+        task = self._tasks.get(threading.get_ident())
+        if parsed is None or task is None:
+            return
+        task.phase, task.percent, received = parsed
+        if received is not None:
+            task.received = received
+        self._dirty = True
+
+    def failed(self) -> None:
+        """Count the current worker's repository as failed."""
+        self._local.failed = True
+
+    def run(self, args, **kwargs):
+        """Run a git transfer, streaming --progress into the view when it is live."""
+        if self.enabled:
+            return run_progress(args, self.progress, **kwargs)
+        return run(args, capture_output=True, text=True, **kwargs)
+
+    def echo(self, line: str) -> None:
+        if not self.enabled:
+            typer.echo(line)
+            return
+        with self._lock:
+            self._clear()
+            sys.stdout.write(line + "\n")
+            self._draw()
+
+    def _refresh(self) -> None:
+        while not self._stop.wait(1 / REFRESH_HZ):
+            with self._lock:
+                if self._dirty:
+                    self._clear()
+                    self._draw()
+
+    def _clear(self) -> None:
+        if self._drawn:
+            sys.stdout.write(f"\x1b[{self._drawn}F\x1b[J")
+            self._drawn = 0
+
+    def _lines(self):
+        elapsed = max(time.perf_counter() - self._start, 1e-6)
+        received = self._received + sum(task.received for task in self._tasks.values())
+        rate = self.completed / elapsed
+        remaining = self.total - self.completed
+        eta = format_duration(remaining / rate) if rate and remaining else "--"
+        yield (
+            f"{self.icon} {self.completed}/{self.total} done · {self.failures} failed · "
+            f"{rate:.1f} repos/s · {format_bytes(received / elapsed)}/s · ETA {eta}"
+        )
+        for task in self._tasks.values():
+            size = f" {format_bytes(task.received)}" if task.received else ""
+            yield f"   {task.label:<24} {task.phase} {task.percent}%{size}"
+
+    def _draw(self) -> None:
+        columns, rows = shutil.get_terminal_size()
+        lines = [line[:columns - 2] for line in self._lines()][:max(rows - 1, 1)]
+        sys.stdout.write("".join(line + "\x1b[K\n" for line in lines))
+        sys.stdout.flush()
+        self._drawn = len(lines)
+        self._dirty = False
@@ -0,0 +1,223 @@
+import os
+import subprocess
+import tarfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from gits.utils.cache import load_json, save_json
+from gits.utils.git_status import read_status
+from gits.utils.gitmeta import git_dir, read_head
+from gits.utils.process import run
+
+MANIFEST = "manifest.json"
+MANIFEST_VERSION = 2
+# Refs a bundle carries; HEAD lets `git clone` pick the branch to check out
+BUNDLE_REFS = ("HEAD", "--branches", "--tags")
+IMPORT_REFSPECS = ("+refs/heads/*:refs/remotes/origin/*", "refs/tags/*:refs/tags/*")
+
+
+class BundleMissing(Exception):
+    pass
+
+
+def load_manifest(directory: Path) -> dict:
+    manifest = load_json(directory / MANIFEST, {})
+    if manifest.get("version") != MANIFEST_VERSION:
+        manifest = {"version": MANIFEST_VERSION, "repos": {}}
+    return manifest
+
+
+def save_manifest(directory: Path, manifest: dict) -> None:
+    save_json(directory / MANIFEST, manifest)
+
+
+def _for_each_ref(path: Path, *patterns: str) -> Dict[str, str]:
+    result = run(
+        ["git", "-C", str(path), "for-each-ref", "--format=%(objectname) %(refname)", *patterns],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    refs = {}
+    for line in result.stdout.splitlines():
+        sha, _, ref = line.partition(" ")
+        refs[ref] = sha
+    return refs
+
+
+def repo_refs(path: Path) -> Dict[str, str]:
+    """Branch and tag tips plus HEAD, as the bundle would record them."""
+    refs = _for_each_ref(path, "refs/heads", "refs/tags")
+    _, head = read_head(git_dir(path))
+    if head:
+        refs["HEAD"] = head
+    return refs
+
+
+def present(path: Path, shas: Iterable[str]) -> Set[str]:
+    """The objects among shas that exist in the repository, in one cat-file call."""
+    shas = sorted(set(shas))
+    if not shas:
+        return set()
+    result = run(
+        ["git", "-C", str(path), "cat-file", "--batch-check=%(objectname)"],
+        input="\n".join(shas) + "\n",
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return {line for line in result.stdout.splitlines() if not line.endswith(" missing")}
+
+
+def chain(entry: dict) -> List[dict]:
+    """Bundles to apply in order: the latest full bundle and everything after it."""
+    bundles = entry.get("bundles", [])
+    start = max((n for n, bundle in enumerate(bundles) if bundle["full"]), default=0)
+    return bundles[start:]
+
+
+def list_heads(path: Path, bundle: Path) -> Dict[str, str]:
+    """The refs a written bundle actually carries."""
+    result = run(
+        ["git", "-C", str(path), "bundle", "list-heads", str(bundle)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    heads = {}
+    for line in result.stdout.splitlines():
+        sha, _, ref = line.partition(" ")
+        heads[ref] = sha
+    return heads
+
+
+def export_bundle(
+    path: Path, directory: Path, key: str, entry: dict, full: bool = False,
+) -> Optional[Tuple[dict, Optional[dict]]]:
+    """Bundle what changed in path since the refs recorded in entry.
+
+    Objects reachable from the previously exported tips are left out, so
+    each bundle only depends on the ones before it. A ref that moved onto
+    an already exported commit (say a new tag on an old commit) adds no
+    objects, so git leaves it out of the bundle; the entry's refs still
+    record it and import sets it from there. Returns the updated manifest
+    entry and the bundle written, if any, or None when nothing changed.
+    """
+    refs = repo_refs(path)
+    previous = {} if full else entry.get("refs", {})
+    if refs == previous:
+        return None
+
+    basis = sorted(present(path, previous.values()))
+    seq = entry.get("seq", 0) + 1
+    name = f"{key}/{seq:04d}.bundle"
+    target = directory / name
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}")
+    try:
+        run(
+            ["git", "-C", str(path), "bundle", "create", "-q", str(tmp), *BUNDLE_REFS,
+             *(["--not", *basis] if basis else [])],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except subprocess.CalledProcessError as e:
+        tmp.unlink(missing_ok=True)
+        if "empty bundle" not in (e.stderr or "") or not basis:
+            raise
+        # Only refs moved: nothing to write, the manifest carries them
+        return {**entry, "refs": refs}, None
+    os.replace(tmp, target)
+
+    bundles = [] if not basis else list(entry.get("bundles", []))
+    if not basis:
+        for old in entry.get("bundles", []):
+            (directory / old["file"]).unlink(missing_ok=True)
+    bundle = {"file": name, "refs": list_heads(path, target), "full": not basis, "bytes": target.stat().st_size}
+    bundles.append(bundle)
+    return {"refs": refs, "seq": seq, "bundles": bundles}, bundle
+
+
+def _local_ref(ref: str) -> Optional[str]:
+    """Where an exported ref lands in the importing repository; None for HEAD."""
+    if ref.startswith("refs/heads/"):
+        return f"refs/remotes/origin/{ref[len('refs/heads/'):]}"
+    if ref.startswith("refs/tags/"):
+        return ref
+    return None
+
+
+def _moved_refs(path: Path, refs: Dict[str, str]) -> Dict[str, str]:
+    """Local refs that differ from the exported state: {local ref: sha}."""
+    wanted = {_local_ref(ref): sha for ref, sha in refs.items() if _local_ref(ref)}
+    current = _for_each_ref(path, "refs/remotes/origin", "refs/tags")
+    return {ref: sha for ref, sha in wanted.items() if current.get(ref) != sha}
+
+
+def import_bundles(path: Path, directory: Path, entry: dict, url: Optional[str]) -> str:
+    """Clone path from its bundle chain or fetch the bundles it is missing.
+
+    Remote-tracking branches and tags are then set to the refs recorded at
+    export, which also applies moves that carried no objects. Returns
+    "cloned", "updated" or "up_to_date". The checked-out branch is
+    fast-forwarded when it is clean and strictly behind.
+    """
+    bundles = chain(entry)
+    action = "updated"
+
+    if not path.exists():
+        first = directory / bundles[0]["file"]
+        if not first.exists():
+            raise BundleMissing(bundles[0]["file"])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        run(["git", "clone", "-q", str(first), str(path)], capture_output=True, text=True, check=True)
+        if url:
+            run(["git", "-C", str(path), "remote", "set-url", "origin", url], capture_output=True, text=True, check=True)
+        bundles = bundles[1:]
+        action = "cloned"
+
+    pending = [bundle for bundle in bundles if set(bundle["refs"].values()) - present(path, bundle["refs"].values())]
+    for bundle in pending:
+        source = directory / bundle["file"]
+        if not source.exists():
+            raise BundleMissing(bundle["file"])
+        run(
+            ["git", "-C", str(path), "fetch", "-q", str(source), *IMPORT_REFSPECS],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+    moved = _moved_refs(path, entry.get("refs", {}))
+    missing = set(moved.values()) - present(path, moved.values())
+    if missing:
+        raise BundleMissing(f"objects for {', '.join(sorted(ref for ref, sha in moved.items() if sha in missing))}")
+    for ref, sha in moved.items():
+        run(["git", "-C", str(path), "update-ref", ref, sha], capture_output=True, text=True, check=True)
+
+    if not pending and not moved and action != "cloned":
+        return "up_to_date"
+
+    status = read_status(path)
+    if status.upstream and status.behind and not status.ahead and not status.dirty:
+        run(["git", "-C", str(path), "merge", "-q", "--ff-only", status.upstream],
+            capture_output=True, text=True, check=True)
+    return action
+
+
+def write_archive(archive: Path, directory: Path, files: Iterable[str]) -> None:
+    """Pack the manifest and the given bundle files into one tar to carry across."""
+    archive.parent.mkdir(parents=True, exist_ok=True)
+    with tarfile.open(archive, "w") as tar:
+        tar.add(directory / MANIFEST, arcname=MANIFEST)
+        for name in files:
+            tar.add(directory / name, arcname=name)
+
+
+def extract_archive(archive: Path, directory: Path) -> None:
+    with tarfile.open(archive) as tar:
+        if hasattr(tarfile, "data_filter"):
+            tar.extractall(directory, filter="data")
+        else:
+            tar.extractall(directory)
@@ -0,0 +1,27 @@
+import json
+import os
+import threading
+from pathlib import Path
+
+CACHE_DIR = Path(os.getenv("XDG_CACHE_HOME", f"{Path.home()}/.cache")) / "gits"
+# Data that must outlive a cache wipe: mirrors and trash
+DATA_DIR = Path(os.getenv("XDG_DATA_HOME", f"{Path.home()}/.local/share")) / "gits"
+
+def load_json(path: Path, default=None):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def save_json(path: Path, data) -> None:
+    """Write data atomically so an interrupted run never leaves a torn cache file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}")
+    try:
+        with open(tmp, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
@@ -0,0 +1,66 @@
+import os
+from pathlib import Path
+from typing import List, NamedTuple
+
+from gits.utils.disk import disk_usage
+from gits.utils.process import run
+
+
+class CleanPlan(NamedTuple):
+    tracked: int
+    untracked: int
+    ignored: int
+    removable: List[str]
+    reclaimable: int
+
+    @property
+    def needs_reset(self) -> bool:
+        return self.tracked > 0
+
+    @property
+    def needs_clean(self) -> bool:
+        return bool(self.removable)
+
+    def summary(self) -> str:
+        counts = [
+            f"{count} {label}"
+            for count, label in ((self.tracked, "changed"), (self.untracked, "untracked"), (self.ignored, "ignored"))
+            if count
+        ]
+        return ", ".join(counts)
+
+
+def plan_clean(path: Path) -> CleanPlan:
+    """Describe what ``reset --hard`` plus ``clean -ffdx`` would do, using one git status.
+
+    Untracked and ignored directories are reported collapsed, exactly as
+    ``clean -d`` removes them, so their size is one tree walk each.
+    """
+    result = run(
+        ["git", "-C", str(path), "--no-optional-locks", "status", "--porcelain=v2", "-z",
+         "--untracked-files=normal", "--ignored=traditional"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    tracked = untracked = ignored = 0
+    removable = []
+    records = iter(result.stdout.split("\0"))
+    for record in records:
+        if not record:
+            continue
+        kind = record[0]
+        if kind in "12u":
+            tracked += 1
+            if kind == "2":
+                next(records, None)
+        elif kind == "?":
+            untracked += 1
+            removable.append(record[2:])
+        elif kind == "!":
+            ignored += 1
+            removable.append(record[2:])
+
+    reclaimable = sum(disk_usage(os.path.join(path, name)) for name in removable)
+    return CleanPlan(tracked, untracked, ignored, removable, reclaimable)
@@ -0,0 +1,63 @@
+import re
+from typing import List, Optional
+
+# Filter specs accepted by `git clone --filter`
+FILTER_PATTERN = re.compile(
+    r"^(blob:none|blob:limit=\d+[kmg]?|tree:\d+|object:type=(blob|tree|commit|tag)|sparse:oid=\S+|combine:\S+)$"
+)
+
+CLONE_KEYS = ("depth", "filter", "single_branch", "sparse")
+
+
+def validate_repo_options(repo: dict) -> List[str]:
+    """Return a list of problems with the clone options of a repository entry."""
+    errors = []
+
+    depth = repo.get("depth")
+    if depth is not None and (isinstance(depth, bool) or not isinstance(depth, int) or depth < 1):
+        errors.append(f"depth must be a positive integer, got {depth!r}")
+
+    spec = repo.get("filter")
+    if spec is not None and (not isinstance(spec, str) or not FILTER_PATTERN.match(spec)):
+        errors.append(f"filter must be a git filter spec such as blob:none or tree:0, got {spec!r}")
+
+    single_branch = repo.get("single_branch")
+    if single_branch is not None and not isinstance(single_branch, bool):
+        errors.append(f"single_branch must be true or false, got {single_branch!r}")
+
+    sparse = repo.get("sparse")
+    if sparse is not None and (
+        not isinstance(sparse, list) or not sparse or not all(isinstance(p, str) and p for p in sparse)
+    ):
+        errors.append(f"sparse must be a non-empty list of paths, got {sparse!r}")
+
+    return errors
+
+
+def clone_args(repo: dict) -> List[str]:
+    args = []
+    if repo.get("depth"):
+        args.append(f"--depth={repo.get('depth')}")
+    if repo.get("filter"):
+        args.append(f"--filter={repo.get('filter')}")
+    if repo.get("single_branch"):
+        args.append("--single-branch")
+    if repo.get("sparse"):
+        args.append("--sparse")
+    return args
+
+
+def fetch_args(repo: dict) -> List[str]:
+    """Fetch options that keep a repository within its configured footprint.
+
+    Shallow repositories need no --depth here: a plain fetch only adds the
+    new commits on top of the existing shallow boundary.
+    """
+    args = []
+    if repo.get("filter"):
+        args.append(f"--filter={repo.get('filter')}")
+    return args
+
+
+def sparse_paths(repo: dict) -> Optional[List[str]]:
+    return repo.get("sparse") or None
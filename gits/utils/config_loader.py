@@ -1,47 +1,213 @@
+import hashlib
 import os
+import pickle
+import re
 from pathlib import Path
-import yaml
+from typing import Iterator, List
+
+from gits.utils.cache import CACHE_DIR
+from gits.utils.discovery import DEFAULT_IGNORES, DiscoveryCache, discover
+from gits.utils.model import Group, Repo
+from gits.utils.profiler import span
+from gits.utils.selector import RepoIndex
 
 CONFIG_FILE = Path(os.getenv("XDG_CONFIG_HOME", f"{Path.home()}/.config")) / "gits" / "repository_locations.yml"
+CONFIG_CACHE_FILE = CACHE_DIR / "config.pickle"
+CONFIG_CACHE_VERSION = 4
+
+# YAML that cannot be split at top-level keys: anchors and aliases may cross
+# groups, and explicit documents or flow style do not have one key per line
+_NOT_SPLITTABLE = re.compile(rb"(?:^|[\s\[{,])[&*][^\s,\]}]|^(?:---|\.\.\.|\{)", re.M)
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except (OSError, TypeError):
+        return None
+
+def _parse_group(group_name, entries) -> Group:
+    group = Group(group_name)
+
+    # Parse the YAML entries for root_dir and listed repositories
+    for entry in entries:
+        if "root_dir" in entry:
+            group.root_dir = os.path.expanduser(entry["root_dir"])
+        elif "discover_depth" in entry:
+            group.discover_depth = int(entry["discover_depth"])
+        elif "discover_ignore" in entry:
+            group.discover_ignore = (*DEFAULT_IGNORES, *entry["discover_ignore"])
+        elif "tags" in entry:
+            tags = entry["tags"]
+            group.tags = (tags,) if isinstance(tags, str) else tuple(tags)
+        elif "repositories" in entry:
+            group.repositories.extend(Repo.from_entry(group_name, repo) for repo in entry["repositories"])
+
+    return group
+
+def _parse_stream(content: bytes) -> Iterator[Group]:
+    """Parse the YAML one top-level group at a time.
+
+    Each group starts at an unindented key, so its lines can go to libyaml on
+    their own and the group is available before the rest of the file is
+    parsed. Files that cannot be split that way are parsed whole.
+    """
+    # yaml is only needed when the cache is stale, so keep it off the startup path
+    import yaml
+    # Prefer libyaml's C loader; fall back to the pure-Python one
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+    if _NOT_SPLITTABLE.search(content):
+        raw = yaml.load(content, Loader=loader) or {}
+        for group_name, entries in raw.items():
+            yield _parse_group(group_name, entries)
+        return
+
+    def parse(chunk: List[bytes]):
+        raw = yaml.load(b"".join(chunk), Loader=loader) or {}
+        for group_name, entries in raw.items():
+            yield _parse_group(group_name, entries)
+
+    chunk = []
+    for line in content.splitlines(keepends=True):
+        if line[:1] not in b" \t#-\r\n" and chunk:
+            yield from parse(chunk)
+            chunk = []
+        chunk.append(line)
+    yield from parse(chunk)
+
+def _add_unlisted(group, cache):
+    """Append repositories found under root_dir that the YAML does not list.
+
+    Returns {directory: mtime} for the directories walked.
+    """
+    root_dir = group.root_dir
+    if not root_dir:
+        return {}
+    if not os.path.isdir(root_dir):
+        # Recorded as missing so creating it later invalidates the cache
+        return {root_dir: None}
+
+    known_aliases = {repo.alias for repo in group.repositories}
+    # Listed repositories may live under root_dir by alias or by target_path
+    listed_paths = {
+        os.path.realpath(path)
+        for repo in group.repositories
+        for path in (os.path.join(root_dir, repo.alias), repo.target_path)
+        if path
+    }
+
+    repos, walked = discover(root_dir, group.discover_depth, group.discover_ignore, cache)
+    for path in repos:
+        alias = os.path.relpath(path, root_dir)
+        if alias in known_aliases or os.path.realpath(path) in listed_paths:
+            continue
+        group.repositories.append(Repo(group.name, alias, target_path=path, unlisted=True))
+    return walked
+
+def _read_cache():
+    # Any failure to load it (truncated file, renamed classes, foreign data) is a miss
+    try:
+        with open(CONFIG_CACHE_FILE, "rb") as f:
+            cached = pickle.load(f)
+        if cached.get("version") != CONFIG_CACHE_VERSION or cached.get("config") != str(CONFIG_FILE):
+            return None
+        if not {"stat", "sha256", "parsed", "walked", "groups", "index"} <= cached.keys():
+            return None
+    except Exception:
+        return None
+
+    return cached
+
+def _walk_unchanged(walked):
+    # Any walked directory gaining or losing an entry may change the unlisted repos
+    return all(_mtime(path) == mtime for path, mtime in walked.items())
+
+def _write_cache(stat, digest, parsed, groups, walked, index):
+    cached = {
+        "version": CONFIG_CACHE_VERSION,
+        "config": str(CONFIG_FILE),
+        "stat": stat,
+        "sha256": digest,
+        "parsed": parsed,
+        "walked": walked,
+        "groups": groups,
+        "index": index,
+    }
+    try:
+        CONFIG_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = CONFIG_CACHE_FILE.with_name(f".{CONFIG_CACHE_FILE.name}.{os.getpid()}")
+        with open(tmp, "wb") as f:
+            pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, CONFIG_CACHE_FILE)
+    except OSError:
+        pass
+
+def load_repos() -> List[Group]:
+    with span("load_repos", config=str(CONFIG_FILE)):
+        return _load_repos()[0]
+
+def load_index() -> RepoIndex:
+    """The selector index for the current config, cached alongside it."""
+    with span("load_repos", config=str(CONFIG_FILE)):
+        return _load_repos()[1]
+
+def iter_groups() -> Iterator[Group]:
+    """Yield groups as they load, so a command can start on the first one.
+
+    With a current cache this walks the cached groups. Otherwise each group
+    is parsed, gets its unlisted repositories and is yielded in turn; the
+    cache is written once the last group has been produced.
+    """
+    yield from _stream()
+
+def _load_repos():
+    groups = []
+    stream = _stream()
+    while True:
+        try:
+            groups.append(next(stream))
+        except StopIteration as done:
+            return groups, done.value
+
+def _stream():
+    """Generate the config's groups; the generator's return value is the RepoIndex."""
+    st = os.stat(CONFIG_FILE)
+    stat = (st.st_mtime_ns, st.st_size)
+    cached = _read_cache()
+    parsed = None
+
+    if cached and cached["stat"] == stat:
+        if _walk_unchanged(cached["walked"]):
+            yield from cached["groups"]
+            return cached["index"]
+        parsed, digest = cached["parsed"], cached["sha256"]
+    else:
+        with open(CONFIG_FILE, "rb") as f:
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest()
+
+        # A touched but unchanged file still matches on content hash
+        if cached and cached["sha256"] == digest:
+            parsed = cached["parsed"]
+            if _walk_unchanged(cached["walked"]):
+                _write_cache(stat, digest, parsed, cached["groups"], cached["walked"], cached["index"])
+                yield from cached["groups"]
+                return cached["index"]
+
+    parsed_groups = []
+    groups = []
+    walked = {}
+    discovery_cache = DiscoveryCache()
+    for group in parsed if parsed is not None else _parse_stream(content):
+        parsed_groups.append(group)
+        # Discovery appends to the group, so keep the parsed one pristine for next time
+        group = group.copy()
+        with span("discover_unlisted", group=group.name):
+            walked.update(_add_unlisted(group, discovery_cache))
+        groups.append(group)
+        yield group
+    discovery_cache.save()
 
-def load_repos():
-    with open(CONFIG_FILE, "r") as f:
-        raw = yaml.safe_load(f)
-
-    result = []
-    for group_name, entries in raw.items():
-        group = {"group_name": group_name, "root_dir": None, "repositories": []}
-
-        # Parse the YAML entries for root_dir and listed repositories
-        for entry in entries:
-            if "root_dir" in entry:
-                group["root_dir"] = os.path.expanduser(entry["root_dir"])
-            elif "repositories" in entry:
-                group["repositories"].extend(entry["repositories"])
-
-        known_aliases = {repo["alias"] for repo in group["repositories"]}
-        root_dir = group["root_dir"]
-
-        # Avoid adding subdirectories of listed repositories
-        listed_paths = {
-            os.path.realpath(os.path.join(root_dir, repo["alias"]))
-            for repo in group["repositories"]
-        }
-
-        if root_dir and os.path.isdir(root_dir):
-            for entry in os.scandir(root_dir):
-                entry_path = os.path.realpath(entry.path)
-                if (
-                    entry.is_dir()
-                    and entry.name not in known_aliases
-                    and entry_path not in listed_paths
-                ):
-                    group["repositories"].append({
-                        "alias": entry.name,
-                        "target_path": entry_path,
-                        "unlisted": True
-                    })
-
-        result.append(group)
-
-    return result
+    index = RepoIndex(groups)
+    _write_cache(stat, digest, parsed_groups, groups, walked, index)
+    return index
@@ -0,0 +1,201 @@
+import json
+import os
+import socketserver
+import subprocess
+import threading
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from gits.utils.config_loader import CONFIG_FILE
+from gits.utils.daemon_client import SOCKET_PATH, request
+from gits.utils.git_status import read_status
+from gits.utils.repos import filtered_repos
+from gits.utils.runner import run_parallel
+from gits.utils.watch import RepoWatcher
+
+# Coalesce bursts of events (a checkout touches thousands of files) into one refresh
+DEBOUNCE_SECONDS = 0.2
+
+
+class DaemonRunning(Exception):
+    pass
+
+
+class _Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class StatusDaemon:
+    """Keep the status of every listed repository in memory and refresh on change."""
+
+    def __init__(self, poll_interval: float = 2.0, use_inotify: bool = True, jobs: Optional[int] = None,
+                 log=None):
+        self.jobs = jobs
+        self.log = log or (lambda message: None)
+        self.started = time.time()
+        self.refreshes = 0
+        self.queries = 0
+        self._entries: Dict[str, dict] = {}
+        self._changed = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._stop = threading.Event()
+        self._config_mtime = None
+        self.watcher = RepoWatcher(self.mark_changed, poll_interval, use_inotify)
+        self.server = None
+
+    def mark_changed(self, repo: str) -> None:
+        with self._wake:
+            self._changed.add(repo)
+            self._wake.notify()
+
+    def refresh(self, repo: str) -> None:
+        path = Path(repo)
+        if not path.exists():
+            entry = None
+        else:
+            try:
+                entry = {"status": asdict(read_status(path, optional_locks=False))}
+            except subprocess.CalledProcessError as e:
+                entry = {"error": (e.stderr or "").strip() or "is not a git repository"}
+
+        with self._lock:
+            self.refreshes += 1
+            if entry is None:
+                self._entries.pop(repo, None)
+            else:
+                self._entries[repo] = entry
+        if entry is None:
+            self.watcher.discard(repo)
+
+    def track(self, repos) -> None:
+        """Watch and compute the status of repos not seen before."""
+        with self._lock:
+            new = [repo for repo in repos if repo not in self._entries and Path(repo).exists()]
+        for repo in new:
+            self.watcher.add(repo)
+        for _ in run_parallel([(repo,) for repo in new], self.refresh, self.jobs):
+            pass
+        if new:
+            self.log(f"Tracking {len(new)} new repositories")
+
+    def load_config(self) -> None:
+        try:
+            self._config_mtime = os.stat(CONFIG_FILE).st_mtime_ns
+        except OSError:
+            self._config_mtime = None
+            return
+        self.track([
+            str(repo.path)
+            for group_name, repo in filtered_repos(None)
+            if not repo.unlisted
+        ])
+
+    def _refresh_loop(self) -> None:
+        while not self._stop.is_set():
+            with self._wake:
+                self._wake.wait_for(lambda: self._changed or self._stop.is_set(), timeout=1.0)
+            if self._stop.is_set():
+                return
+
+            try:
+                mtime = os.stat(CONFIG_FILE).st_mtime_ns
+            except OSError:
+                mtime = None
+            if mtime != self._config_mtime:
+                self.log("Configuration changed; reloading")
+                self.load_config()
+
+            if not self._changed:
+                continue
+            time.sleep(DEBOUNCE_SECONDS)
+            with self._lock:
+                changed, self._changed = self._changed, set()
+            for _ in run_parallel([(repo,) for repo in sorted(changed)], self.refresh, self.jobs):
+                pass
+
+    def handle(self, message: dict) -> dict:
+        op = message.get("op")
+        if op == "ping":
+            with self._lock:
+                repos = len(self._entries)
+            return {
+                "ok": True, "pid": os.getpid(), "mode": self.watcher.mode, "repos": repos,
+                "uptime": round(time.time() - self.started, 1), "queries": self.queries,
+                "refreshes": self.refreshes, **self.watcher.counts(),
+            }
+
+        if op == "status":
+            paths = message.get("paths") or []
+            with self._lock:
+                self.queries += 1
+                pending = [path for path in paths if path in self._changed]
+                unknown = [path for path in paths if path not in self._entries]
+            unknown = [path for path in unknown if os.path.exists(path)]
+            # Answer changed repos fresh rather than waiting for the debounce
+            for path in pending:
+                self.refresh(path)
+            with self._lock:
+                repos = {path: self._entries[path] for path in paths if path in self._entries}
+            if unknown:
+                # Repositories cloned since startup; the client computes them this time
+                threading.Thread(target=self.track, args=(unknown,), daemon=True).start()
+            return {"ok": True, "repos": repos}
+
+        if op == "shutdown":
+            threading.Thread(target=self.stop, daemon=True).start()
+            return {"ok": True}
+
+        return {"ok": False, "error": f"unknown op: {op}"}
+
+    def serve(self, on_ready: Optional[Callable[[], None]] = None) -> None:
+        """Serve until stopped; on_ready runs once the socket is bound."""
+        if request({"op": "ping"}) is not None:
+            raise DaemonRunning(f"A daemon is already listening on {SOCKET_PATH}")
+        SOCKET_PATH.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        try:
+            SOCKET_PATH.unlink()
+        except FileNotFoundError:
+            pass
+
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        response = daemon.handle(json.loads(line))
+                    except ValueError:
+                        response = {"ok": False, "error": "invalid request"}
+                    self.wfile.write(json.dumps(response).encode() + b"\n")
+
+        self.load_config()
+        watcher_thread = threading.Thread(target=self.watcher.run, daemon=True)
+        refresh_thread = threading.Thread(target=self._refresh_loop, daemon=True)
+        watcher_thread.start()
+        refresh_thread.start()
+
+        self.server = _Server(str(SOCKET_PATH), Handler)
+        os.chmod(SOCKET_PATH, 0o600)
+        try:
+            if on_ready:
+                on_ready()
+            self.server.serve_forever(poll_interval=0.5)
+        finally:
+            self._stop.set()
+            self.watcher.stop()
+            with self._wake:
+                self._wake.notify_all()
+            self.server.server_close()
+            try:
+                SOCKET_PATH.unlink()
+            except FileNotFoundError:
+                pass
+            watcher_thread.join(timeout=2)
+            refresh_thread.join(timeout=2)
+
+    def stop(self) -> None:
+        if self.server:
+            self.server.shutdown()
@@ -0,0 +1,43 @@
+import json
+import os
+import socket
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from gits.utils.cache import CACHE_DIR
+
+RUNTIME_DIR = Path(os.environ["XDG_RUNTIME_DIR"]) / "gits" if os.getenv("XDG_RUNTIME_DIR") else CACHE_DIR
+SOCKET_PATH = Path(os.getenv("GITS_DAEMON_SOCKET", RUNTIME_DIR / "daemon.sock"))
+
+# Shell prompts call status constantly; never let a wedged daemon stall them
+CLIENT_TIMEOUT = 2.0
+
+
+def request(payload: dict, timeout: float = CLIENT_TIMEOUT) -> Optional[dict]:
+    """Send one JSON request line to the daemon; None when it is not running."""
+    if not SOCKET_PATH.exists():
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(SOCKET_PATH))
+            sock.sendall(json.dumps(payload).encode() + b"\n")
+            with sock.makefile("rb") as reader:
+                line = reader.readline()
+    except OSError:
+        return None
+    try:
+        return json.loads(line) if line else None
+    except ValueError:
+        return None
+
+
+def query_status(paths: Iterable[Path]) -> Optional[Dict[str, dict]]:
+    """Return {path: entry} for the paths the daemon knows, or None without a daemon.
+
+    An entry holds either "status" (RepoStatus fields) or "error".
+    """
+    response = request({"op": "status", "paths": [str(path) for path in paths]})
+    if not response or not response.get("ok"):
+        return None
+    return response.get("repos", {})
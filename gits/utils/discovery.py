@@ -0,0 +1,117 @@
+import os
+from fnmatch import fnmatch
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from gits.utils.cache import CACHE_DIR, load_json, save_json
+from gits.utils.runner import run_parallel
+
+DISCOVERY_CACHE_FILE = CACHE_DIR / "discovery.json"
+DISCOVERY_CACHE_VERSION = 2
+
+DEFAULT_DEPTH = 3
+DEFAULT_IGNORES = (".*", "node_modules")
+# Directory walking is I/O bound, so use more threads than CPUs
+DISCOVERY_JOBS = 8
+
+
+def is_repo(path: str) -> bool:
+    """True for a worktree with a .git directory, or a .git file (worktrees, submodules)."""
+    git_path = os.path.join(path, ".git")
+    if os.path.isdir(git_path):
+        return True
+    try:
+        with open(git_path, "r") as f:
+            return f.read(8) == "gitdir: "
+    except OSError:
+        return False
+
+
+def _ignored(name: str, relative: str, ignores: Iterable[str]) -> bool:
+    return any(fnmatch(name, pattern) or fnmatch(relative, pattern) for pattern in ignores)
+
+
+class DiscoveryCache:
+    """Per-directory scan results, reused while the directory mtime is unchanged.
+
+    A directory's mtime changes whenever an entry is added, removed or renamed
+    in it, which is all discovery depends on. Repositories are boundaries: they
+    are re-examined when their own mtime changes, which removing or replacing
+    .git does, but their subdirectories are never walked.
+    """
+
+    def __init__(self):
+        data = load_json(DISCOVERY_CACHE_FILE, {})
+        self._entries = data.get("dirs", {}) if data.get("version") == DISCOVERY_CACHE_VERSION else {}
+        self._dirty = False
+
+    def scan(self, path: str, container: bool) -> Optional[dict]:
+        """Return {"repo": True, "mtime": ...} or {"repo": False, "mtime": ..., "children": [names]}."""
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+        cached = self._entries.get(path)
+        if cached and cached["mtime"] == mtime and (not cached["repo"] or not container):
+            return cached
+
+        if not container and is_repo(path):
+            entry = {"repo": True, "mtime": mtime}
+        else:
+            try:
+                with os.scandir(path) as entries:
+                    children = sorted(e.name for e in entries if e.is_dir(follow_symlinks=False))
+            except OSError:
+                return None
+            entry = {"repo": False, "mtime": mtime, "children": children}
+
+        self._entries[path] = entry
+        self._dirty = True
+        return entry
+
+    def save(self) -> None:
+        if self._dirty:
+            save_json(DISCOVERY_CACHE_FILE, {"version": DISCOVERY_CACHE_VERSION, "dirs": self._entries})
+
+
+def discover(
+    root: str,
+    depth: int = DEFAULT_DEPTH,
+    ignores: Iterable[str] = DEFAULT_IGNORES,
+    cache: Optional[DiscoveryCache] = None,
+) -> Tuple[List[str], Dict[str, int]]:
+    """Find repositories up to depth levels below root, one directory level at a time in parallel.
+
+    Returns the repository paths, sorted, and {directory: mtime} for every
+    directory examined, repositories included, so callers can tell when to
+    look again.
+    """
+    cache = cache or DiscoveryCache()
+    ignores = tuple(ignores)
+    repos = []
+    walked = {}
+
+    frontier = [(root, 0)]
+    while frontier:
+        scans = run_parallel(
+            [(path, level == 0) for path, level in frontier],
+            cache.scan,
+            DISCOVERY_JOBS,
+        )
+        next_frontier = []
+        for ((path, _), entry), (_, level) in zip(scans, frontier):
+            if entry is None:
+                continue
+            walked[path] = entry["mtime"]
+            if entry["repo"]:
+                repos.append(path)
+                continue
+            if level >= depth:
+                continue
+            for name in entry["children"]:
+                child = os.path.join(path, name)
+                if not _ignored(name, os.path.relpath(child, root), ignores):
+                    next_frontier.append((child, level + 1))
+        frontier = next_frontier
+
+    return sorted(repos), walked
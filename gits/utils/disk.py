@@ -0,0 +1,29 @@
+import os
+from pathlib import Path
+
+
+def disk_usage(path: Path) -> int:
+    """Bytes allocated on disk for path, recursing into directories without following symlinks."""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return 0
+    total = st.st_blocks * 512
+    if not os.path.isdir(path) or os.path.islink(path):
+        return total
+
+    stack = [str(path)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    total += entry.stat(follow_symlinks=False).st_blocks * 512
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                except OSError:
+                    continue
+    return total
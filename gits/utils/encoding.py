@@ -0,0 +1,99 @@
+import codecs
+import fnmatch
+import os
+from typing import Iterator, List, NamedTuple, Optional, Sequence
+
+SNIFF_BYTES = 4096
+CHUNK_BYTES = 1 << 20
+
+# Directories that never hold convertible sources
+ALWAYS_IGNORED = (".git",)
+
+
+class FileResult(NamedTuple):
+    path: str
+    encoding: Optional[str]
+    bytes_read: int
+    converted: bool
+
+
+def _ignored(name: str, rel_path: str, ignores: Sequence[str]) -> bool:
+    return any(fnmatch.fnmatch(name, glob) or fnmatch.fnmatch(rel_path, glob) for glob in ignores)
+
+
+def iter_files(root: str, ignores: Sequence[str] = ()) -> Iterator[str]:
+    """Walk root, pruning .git and any directory or file matching an ignore glob."""
+    ignores = (*ALWAYS_IGNORED, *ignores)
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel_dir = os.path.relpath(dirpath, root)
+        dirnames[:] = [
+            d for d in dirnames
+            if not _ignored(d, os.path.normpath(os.path.join(rel_dir, d)), ignores)
+        ]
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            if not os.path.islink(path) and not _ignored(name, os.path.normpath(os.path.join(rel_dir, name)), ignores):
+                yield path
+
+
+def sniff_utf16(head: bytes) -> Optional[str]:
+    """Return the codec for UTF-16 text judging by the first bytes, else None."""
+    if head.startswith(codecs.BOM_UTF32_LE) or head.startswith(codecs.BOM_UTF32_BE):
+        return None
+    if head.startswith(codecs.BOM_UTF16_LE) or head.startswith(codecs.BOM_UTF16_BE):
+        return "utf-16"
+
+    # Without a BOM, mostly-ASCII UTF-16 has a NUL in every other byte and
+    # none in between. Binary files scatter NULs across both positions.
+    size = len(head) - len(head) % 2
+    if size < 4:
+        return None
+    pairs = size // 2
+    even_nuls = head[0:size:2].count(0)
+    odd_nuls = head[1:size:2].count(0)
+    if odd_nuls >= pairs * 0.9 and even_nuls == 0:
+        return "utf-16-le"
+    if even_nuls >= pairs * 0.9 and odd_nuls == 0:
+        return "utf-16-be"
+    return None
+
+
+def convert_file(path: str, dry_run: bool = False) -> FileResult:
+    """Sniff path and, when it is UTF-16 text, rewrite it as UTF-8 in place.
+
+    Conversion streams through an incremental decoder into a temporary file
+    next to the original, which is then renamed over it.
+    """
+    try:
+        with open(path, "rb") as src:
+            head = src.read(SNIFF_BYTES)
+            encoding = sniff_utf16(head)
+            if encoding is None or dry_run:
+                return FileResult(path, encoding, len(head), False)
+
+            decoder = codecs.getincrementaldecoder(encoding)()
+            tmp = f"{path}.gits-convert"
+            bytes_read = len(head)
+            try:
+                with open(tmp, "w", encoding="utf-8", newline="") as dst:
+                    chunk = head
+                    while chunk:
+                        dst.write(decoder.decode(chunk))
+                        chunk = src.read(CHUNK_BYTES)
+                        bytes_read += len(chunk)
+                    dst.write(decoder.decode(b"", final=True))
+                os.chmod(tmp, os.stat(path).st_mode & 0o7777)
+                os.replace(tmp, path)
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.unlink(tmp)
+                raise
+    except (UnicodeError, OSError):
+        return FileResult(path, None, 0, False)
+
+    return FileResult(path, encoding, bytes_read, True)
+
+
+def convert_files(paths: Sequence[str], dry_run: bool = False) -> List[FileResult]:
+    """convert_file over a batch of paths; one process-pool task per batch."""
+    return [convert_file(path, dry_run) for path in paths]
@@ -0,0 +1,54 @@
+from pathlib import Path
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from gits.utils.gitmeta import git_dir, resolve_ref, upstream as read_upstream
+from gits.utils.process import run
+
+
+class Tracking(NamedTuple):
+    remote: str
+    remote_ref: str
+    url: str
+    upstream: str
+    upstream_sha: Optional[str]
+
+
+def read_tracking(path: Path, branch: Optional[str]) -> Optional[Tracking]:
+    """Describe the upstream of branch, or None when it does not track a remote."""
+    gdir = git_dir(path)
+    tracked = read_upstream(gdir, branch) if gdir else None
+    if tracked is None:
+        return None
+
+    remote, remote_ref, url = tracked
+    upstream = f"refs/remotes/{remote}/{remote_ref[len('refs/heads/'):]}"
+    return Tracking(remote, remote_ref, url, upstream, resolve_ref(gdir, upstream))
+
+
+def ls_remote(url: str, refs: Iterable[str]) -> Dict[str, str]:
+    """Return {ref: sha} for refs on url with a single ls-remote call."""
+    refs = sorted(set(refs))
+    result = run(
+        ["git", "ls-remote", url, *refs],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wanted = set(refs)
+    heads = {}
+    for line in result.stdout.splitlines():
+        sha, _, ref = line.partition("\t")
+        if ref in wanted:
+            heads[ref] = sha
+    return heads
+
+
+def ahead_behind(path: Path, upstream: str) -> Tuple[int, int]:
+    result = run(
+        ["git", "-C", str(path), "rev-list", "--left-right", "--count", f"HEAD...{upstream}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    ahead, behind = result.stdout.split()
+    return int(ahead), int(behind)
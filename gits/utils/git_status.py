@@ -0,0 +1,112 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from gits.utils.gitmeta import git_dir, stash_count
+from gits.utils.process import run
+
+
+@dataclass
+class RepoStatus:
+    branch: Optional[str] = None
+    oid: Optional[str] = None
+    upstream: Optional[str] = None
+    ahead: int = 0
+    behind: int = 0
+    staged: int = 0
+    unstaged: int = 0
+    untracked: int = 0
+    conflicts: int = 0
+    stashes: int = 0
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self.staged or self.unstaged or self.untracked or self.conflicts)
+
+    @property
+    def modified(self) -> bool:
+        return self.dirty or self.stashes > 0
+
+    def summary(self) -> str:
+        """One-line summary, e.g. ``main ↑1 ↓2 · 1 staged, 3 untracked, 1 stash``."""
+        head = self.branch or "(detached)"
+        if self.ahead:
+            head += f" ↑{self.ahead}"
+        if self.behind:
+            head += f" ↓{self.behind}"
+
+        counts = [
+            f"{count} {label}"
+            for count, label in (
+                (self.staged, "staged"),
+                (self.unstaged, "unstaged"),
+                (self.untracked, "untracked"),
+                (self.conflicts, "conflicts"),
+                (self.stashes, "stash"),
+            )
+            if count
+        ]
+        return f"{head} · {', '.join(counts)}" if counts else head
+
+
+def parse_porcelain_v2(output: str) -> RepoStatus:
+    """Parse ``git status --porcelain=v2 --branch -z`` output (``--show-stash`` lines too)."""
+    status = RepoStatus()
+    records = iter(output.split("\0"))
+
+    for record in records:
+        if not record:
+            continue
+
+        kind = record[0]
+        if kind == "#":
+            key, _, value = record[2:].partition(" ")
+            if key == "branch.oid":
+                status.oid = None if value == "(initial)" else value
+            elif key == "branch.head":
+                status.branch = None if value == "(detached)" else value
+            elif key == "branch.upstream":
+                status.upstream = value
+            elif key == "branch.ab":
+                ahead, behind = value.split()
+                status.ahead = int(ahead)
+                status.behind = -int(behind)
+            elif key == "stash":
+                status.stashes = int(value)
+        elif kind in "12":
+            xy = record[2:4]
+            if xy[0] != ".":
+                status.staged += 1
+            if xy[1] != ".":
+                status.unstaged += 1
+            if kind == "2":
+                # Renames and copies carry the original path as a separate record
+                next(records, None)
+        elif kind == "u":
+            status.conflicts += 1
+        elif kind == "?":
+            status.untracked += 1
+
+    return status
+
+
+def read_status(path: Path, optional_locks: bool = True) -> RepoStatus:
+    """Run a single git status for the repository at path and parse it.
+
+    The stash count is read from the stash reflog rather than --show-stash,
+    which costs git an extra ref walk.
+
+    With optional_locks=False git does not refresh the index on disk, so a
+    watcher running status does not trigger itself.
+    """
+    locks = [] if optional_locks else ["--no-optional-locks"]
+    result = run(
+        ["git", "-C", str(path), *locks, "status", "--porcelain=v2", "--branch", "-z"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    status = parse_porcelain_v2(result.stdout)
+    gdir = git_dir(path)
+    status.stashes = stash_count(gdir) if gdir else 0
+    return status
@@ -0,0 +1,286 @@
+# gits/utils/gitmeta.py
+# Reads HEAD, refs, the stash reflog and branch config straight from the git
+# directory. Anything touching the worktree or object database is left to git.
+import os
+import re
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Symbolic refs can chain; git itself gives up after a handful of hops
+MAX_SYMREF_DEPTH = 5
+
+# ctime, mtime (seconds, nanoseconds), dev, ino, mode, uid, gid, size
+_INDEX_STAT = struct.Struct(">10I")
+_INDEX_EXTENDED = 0x4000
+_INDEX_ASSUME_VALID = 0x8000
+_INDEX_SKIP_WORKTREE = 0x4000
+_INDEX_STAGE = 0x3000
+
+_SECTION = re.compile(r'^\[\s*([^\s"\]]+)(?:\s+"((?:[^"\\]|\\.)*)")?\s*\]')
+
+
+def git_dir(repo_path) -> Optional[str]:
+    """The repository's git directory, following a ``gitdir:`` file."""
+    git_path = os.path.join(repo_path, ".git")
+    if os.path.isdir(git_path):
+        return git_path
+    try:
+        with open(git_path, "r") as f:
+            line = f.readline().strip()
+    except OSError:
+        return None
+    if not line.startswith("gitdir:"):
+        return None
+    return os.path.normpath(os.path.join(repo_path, line[len("gitdir:"):].strip()))
+
+
+def common_dir(gdir: str) -> str:
+    """Where shared refs and config live; differs from gdir for linked worktrees."""
+    try:
+        with open(os.path.join(gdir, "commondir"), "r") as f:
+            return os.path.normpath(os.path.join(gdir, f.readline().strip()))
+    except OSError:
+        return gdir
+
+
+def _ref_dir(gdir: str, ref: str) -> str:
+    # HEAD and other pseudo refs are per worktree; refs/ is shared
+    return common_dir(gdir) if ref.startswith("refs/") else gdir
+
+
+def _read_line(path: str) -> Optional[str]:
+    try:
+        with open(path, "r") as f:
+            return f.readline().strip()
+    except OSError:
+        return None
+
+
+def packed_refs(gdir: str) -> Dict[str, str]:
+    refs = {}
+    try:
+        with open(os.path.join(common_dir(gdir), "packed-refs"), "r") as f:
+            for line in f:
+                if line.startswith(("#", "^")):
+                    continue
+                sha, _, ref = line.strip().partition(" ")
+                if ref:
+                    refs[ref] = sha
+    except OSError:
+        pass
+    return refs
+
+
+def ref_path(gdir: str, ref: str) -> str:
+    """Path of the loose file for ref, whether or not it exists."""
+    return os.path.join(_ref_dir(gdir, ref), ref)
+
+
+def resolve_ref(gdir: str, ref: str) -> Optional[str]:
+    """The sha ref points at, following symbolic refs and packed-refs."""
+    packed = None
+    for _ in range(MAX_SYMREF_DEPTH):
+        value = _read_line(ref_path(gdir, ref))
+        if value is None:
+            if packed is None:
+                packed = packed_refs(gdir)
+            return packed.get(ref)
+        if not value.startswith("ref: "):
+            return value or None
+        ref = value[len("ref: "):]
+    return None
+
+
+def read_head(gdir: str) -> Tuple[Optional[str], Optional[str]]:
+    """Return (branch, sha); branch is None when detached, sha is None on an unborn branch."""
+    head = _read_line(os.path.join(gdir, "HEAD")) or ""
+    if head.startswith("ref: refs/heads/"):
+        branch = head[len("ref: refs/heads/"):]
+        return branch, resolve_ref(gdir, f"refs/heads/{branch}")
+    if head.startswith("ref: "):
+        return None, resolve_ref(gdir, head[len("ref: "):])
+    return None, head or None
+
+
+def stash_entries(gdir: str) -> List[str]:
+    """Stash entries formatted like ``git stash list``, newest first."""
+    try:
+        with open(os.path.join(common_dir(gdir), "logs", "refs", "stash"), "r", errors="replace") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        lines = []
+
+    messages = [line.partition("\t")[2] for line in lines if line]
+    if not messages and resolve_ref(gdir, "refs/stash"):
+        # A stash ref without a reflog still holds one entry
+        messages = [""]
+    return [f"stash@{{{n}}}: {message}" for n, message in enumerate(reversed(messages))]
+
+
+def stash_count(gdir: str) -> int:
+    return len(stash_entries(gdir))
+
+
+def _unquote(value: str) -> str:
+    out = []
+    quoted = False
+    chars = iter(value.strip())
+    for char in chars:
+        if char == '"':
+            quoted = not quoted
+        elif char == "\\":
+            escaped = next(chars, "")
+            out.append({"n": "\n", "t": "\t", "b": "\b"}.get(escaped, escaped))
+        elif char in "#;" and not quoted:
+            break
+        else:
+            out.append(char)
+    return "".join(out).strip() if not quoted else "".join(out)
+
+
+def read_config(gdir: str) -> Dict[str, str]:
+    """Flatten the repository's own config to ``section.subsection.key`` -> value.
+
+    Section and key names are lower-cased as git does; subsections keep their
+    case. Include directives and multi-valued keys are not followed; the last
+    value wins. This is enough for branch tracking and remote URLs.
+    """
+    values = {}
+    section = ""
+    try:
+        with open(os.path.join(common_dir(gdir), "config"), "r", errors="replace") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return values
+
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith(("#", ";")):
+            continue
+        if line.startswith("["):
+            match = _SECTION.match(line)
+            if not match:
+                section = ""
+                continue
+            name, sub = match.groups()
+            if sub is None and "." in name:
+                # Legacy [section.subsection] syntax
+                name, _, sub = name.partition(".")
+            section = f"{name.lower()}.{sub}" if sub is not None else name.lower()
+            line = line[match.end():].strip()
+            if not line:
+                continue
+        key, sep, value = line.partition("=")
+        key = key.strip().lower()
+        if section and key:
+            values[f"{section}.{key}"] = _unquote(value) if sep else "true"
+    return values
+
+
+def upstream(gdir: str, branch: Optional[str]) -> Optional[Tuple[str, str, str]]:
+    """Return (remote, merge ref, remote url) for branch, or None without a remote upstream."""
+    if not branch:
+        return None
+    config = read_config(gdir)
+    remote = config.get(f"branch.{branch}.remote")
+    merge = config.get(f"branch.{branch}.merge")
+    if not remote or not merge or remote == ".":
+        return None
+    return remote, merge, config.get(f"remote.{remote}.url", remote)
+
+
+def index_entries(gdir: str) -> Optional[List[Tuple[str, int, int, int]]]:
+    """(path, mtime in ns, size, mode) for each stage-0 entry git checks against the worktree.
+
+    Entries git does not stat (assume-unchanged, skip-worktree) are left out.
+    Returns an empty list without an index, and None for one this reader
+    cannot follow (unknown version, split index).
+    """
+    try:
+        with open(os.path.join(gdir, "index"), "rb") as f:
+            data = f.read()
+    except OSError:
+        return []
+    if len(data) < 12 or data[:4] != b"DIRC":
+        return None
+    version, count = struct.unpack_from(">II", data, 4)
+    if version not in (2, 3, 4):
+        return None
+
+    oid_size = 32 if read_config(gdir).get("extensions.objectformat") == "sha256" else 20
+    entries = []
+    offset = 12
+    name = b""
+    for _ in range(count):
+        start = offset
+        stat = _INDEX_STAT.unpack_from(data, offset)
+        offset += _INDEX_STAT.size + oid_size
+        flags, = struct.unpack_from(">H", data, offset)
+        offset += 2
+        extended = 0
+        if flags & _INDEX_EXTENDED and version >= 3:
+            extended, = struct.unpack_from(">H", data, offset)
+            offset += 2
+
+        if version == 4:
+            # The name drops that many bytes from the previous one and adds a suffix
+            strip = data[offset] & 0x7F
+            while data[offset] & 0x80:
+                offset += 1
+                strip = ((strip + 1) << 7) | (data[offset] & 0x7F)
+            offset += 1
+            end = data.index(b"\0", offset)
+            name = name[:len(name) - strip] + data[offset:end]
+            offset = end + 1
+        else:
+            end = data.index(b"\0", offset)
+            name = data[offset:end]
+            offset = start + ((end - start + 8) & ~7)
+
+        if flags & (_INDEX_ASSUME_VALID | _INDEX_STAGE) or extended & _INDEX_SKIP_WORKTREE:
+            continue
+        mtime = stat[2] * 1_000_000_000 + stat[3]
+        entries.append((name.decode("utf-8", "surrogateescape"), mtime, stat[9], stat[6]))
+
+    if b"link" in _index_extensions(data, offset):
+        return None
+    return entries
+
+
+def _index_extensions(data: bytes, offset: int) -> List[bytes]:
+    names = []
+    # The trailing checksum is at least 20 bytes; extensions are signature + size + payload
+    while offset + 8 <= len(data) - 20:
+        signature = data[offset:offset + 4]
+        size, = struct.unpack_from(">I", data, offset + 4)
+        names.append(signature)
+        offset += 8 + size
+    return names
+
+
+def sparse_dirs(gdir: str) -> Optional[List[str]]:
+    """Directories of a cone-mode sparse checkout, as ``git sparse-checkout list`` prints them.
+
+    Returns None when the worktree has no sparse-checkout file. Parents git
+    adds to reach a directory are left out.
+    """
+    try:
+        with open(os.path.join(gdir, "info", "sparse-checkout"), "r", errors="replace") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    dirs = []
+    parents = set()
+    for line in lines:
+        line = line.strip()
+        if line.startswith("!/") and line.endswith("/*/"):
+            parents.add(line[2:-3])
+        elif line.startswith("/") and line.endswith("/") and len(line) > 1:
+            dirs.append(line[1:-1])
+    return sorted(d for d in dirs if d not in parents)
+
+
+def is_repository(repo_path: Path) -> bool:
+    gdir = git_dir(repo_path)
+    return gdir is not None and os.path.exists(os.path.join(gdir, "HEAD"))
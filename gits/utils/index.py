@@ -0,0 +1,200 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from gits.utils.cache import CACHE_DIR
+from gits.utils.disk import disk_usage
+from gits.utils.git_status import RepoStatus
+from gits.utils.gitmeta import git_dir
+
+INDEX_FILE = CACHE_DIR / "index.sqlite3"
+SCHEMA_VERSION = 1
+
+# Walking a worktree is the expensive part of an update, so only clone, pull and
+# query --refresh-size measure, and pull at most daily
+SIZE_TTL_SECONDS = 24 * 60 * 60
+
+STATUS_COLUMNS = tuple(RepoStatus.__dataclass_fields__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS repos (
+    path TEXT PRIMARY KEY,
+    group_name TEXT NOT NULL,
+    alias TEXT NOT NULL,
+    branch TEXT,
+    oid TEXT,
+    upstream TEXT,
+    ahead INTEGER,
+    behind INTEGER,
+    staged INTEGER,
+    unstaged INTEGER,
+    untracked INTEGER,
+    conflicts INTEGER,
+    stashes INTEGER,
+    size_bytes INTEGER,
+    size_checked REAL,
+    last_fetch REAL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS repos_group ON repos (group_name);
+"""
+
+
+@contextmanager
+def _connect() -> Iterator[sqlite3.Connection]:
+    """Open the index, rebuilding it when the schema changed; commits on success."""
+    INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(INDEX_FILE, timeout=5)
+    conn.row_factory = sqlite3.Row
+    try:
+        if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            conn.executescript(f"DROP TABLE IF EXISTS repos; {SCHEMA} PRAGMA user_version = {SCHEMA_VERSION};")
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _fetch_time(path: Path) -> Optional[float]:
+    gdir = git_dir(path)
+    if gdir is None:
+        return None
+    try:
+        return os.stat(os.path.join(gdir, "FETCH_HEAD")).st_mtime
+    except OSError:
+        return None
+
+
+class FleetIndex:
+    """Queue repository state from a command run and write it to SQLite in one transaction.
+
+    Workers call update()/remove() from any thread; save() commits at the end.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._updates = {}
+        self._removed = set()
+        self._size_checked = None
+
+    def _needs_size(self, key: str) -> bool:
+        with self._lock:
+            if self._size_checked is None:
+                try:
+                    with _connect() as conn:
+                        rows = conn.execute("SELECT path, size_checked FROM repos").fetchall()
+                    self._size_checked = {row["path"]: row["size_checked"] for row in rows}
+                except sqlite3.Error:
+                    self._size_checked = {}
+            checked = self._size_checked.get(key)
+        return checked is None or time.time() - checked > SIZE_TTL_SECONDS
+
+    def update(
+        self, group_name: str, alias: str, path: Path, status: RepoStatus,
+        fetched: bool = False, checked: bool = False, measure: bool = False,
+    ) -> None:
+        """Record status for path.
+
+        fetched marks a fetch or clone that just happened and checked a remote
+        check that found nothing to fetch; either counts as the last fetch.
+        measure also records the disk usage when the stored one is missing or
+        older than SIZE_TTL_SECONDS.
+        """
+        key = str(path)
+        now = time.time()
+        size = disk_usage(path) if measure and self._needs_size(key) else None
+        row = {
+            "path": key,
+            "group_name": group_name,
+            "alias": alias,
+            **asdict(status),
+            "size_bytes": size,
+            "size_checked": now if size is not None else None,
+            "last_fetch": now if fetched or checked else _fetch_time(path),
+            "updated": now,
+        }
+        with self._lock:
+            self._updates[key] = row
+            self._removed.discard(key)
+
+    def remove(self, path: Path) -> None:
+        with self._lock:
+            self._removed.add(str(path))
+            self._updates.pop(str(path), None)
+
+    def save(self) -> None:
+        if not self._updates and not self._removed:
+            return
+        columns = ("path", "group_name", "alias", *STATUS_COLUMNS, "size_bytes", "size_checked", "last_fetch", "updated")
+        # Keep the previous size and fetch time when this run did not measure them
+        keep = ("size_bytes", "size_checked", "last_fetch")
+        assignments = ", ".join(
+            f"{name} = COALESCE(excluded.{name}, {name})" if name in keep else f"{name} = excluded.{name}"
+            for name in columns[1:]
+        )
+        sql = (
+            f"INSERT INTO repos ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT(path) DO UPDATE SET {assignments}"
+        )
+        try:
+            with _connect() as conn:
+                conn.executemany(sql, [tuple(row[name] for name in columns) for row in self._updates.values()])
+                conn.executemany("DELETE FROM repos WHERE path = ?", [(path,) for path in self._removed])
+        except sqlite3.Error:
+            # The index is a convenience; never fail the command that fed it
+            pass
+
+
+def update_sizes(sizes: Dict[str, int]) -> None:
+    """Store freshly measured disk usage for already indexed paths."""
+    now = time.time()
+    try:
+        with _connect() as conn:
+            conn.executemany(
+                "UPDATE repos SET size_bytes = ?, size_checked = ? WHERE path = ?",
+                [(size, now, path) for path, size in sizes.items()],
+            )
+    except sqlite3.Error:
+        pass
+
+
+def query(
+    repo_group: Optional[str] = None,
+    dirty: bool = False,
+    stashed: bool = False,
+    behind: bool = False,
+    ahead: bool = False,
+    stale_days: Optional[float] = None,
+) -> List[sqlite3.Row]:
+    """Return indexed repositories matching every given filter, ordered by group and alias."""
+    clauses: List[str] = []
+    params: list = []
+    if repo_group:
+        clauses.append("group_name = ?")
+        params.append(repo_group)
+    if dirty:
+        clauses.append("(staged + unstaged + untracked + conflicts) > 0")
+    if stashed:
+        clauses.append("stashes > 0")
+    if behind:
+        clauses.append("behind > 0")
+    if ahead:
+        clauses.append("ahead > 0")
+    if stale_days is not None:
+        clauses.append("(last_fetch IS NULL OR last_fetch < ?)")
+        params.append(time.time() - stale_days * 24 * 60 * 60)
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    if not INDEX_FILE.exists():
+        return []
+    with _connect() as conn:
+        return conn.execute(f"SELECT * FROM repos {where} ORDER BY group_name, alias", params).fetchall()
+
+
+def row_status(row: sqlite3.Row) -> RepoStatus:
+    return RepoStatus(**{name: row[name] for name in STATUS_COLUMNS})
@@ -0,0 +1,117 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from gits.utils.model import Repo
+
+STATE_DIR = Path(os.getenv("XDG_STATE_HOME", f"{Path.home()}/.local/state")) / "gits"
+JOURNAL_DIR = STATE_DIR / "journal"
+# Journals kept per command; older runs are pruned when a new one starts
+JOURNAL_KEEP = 10
+
+STARTED = "started"
+FAILED = "failed"
+
+
+def _read(path: Path) -> Dict[str, dict]:
+    """Last record per repository path; a torn final line from a crash is ignored."""
+    records = {}
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if "path" in record:
+                    records[record["path"]] = record
+    except OSError:
+        pass
+    return records
+
+
+def _alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class Journal:
+    """Append-only record of each repository's outcome for one clone or pull run.
+
+    A --resume run starts from the last final state of every repository in
+    the previous journal, so it can skip what already finished and a resume
+    of a resume still knows the whole run; any other run starts a fresh
+    journal. "started" records are only read from the run right before, to
+    spot a clone that was killed mid-way; they are not carried further.
+    Lines are flushed as they are written and survive Ctrl-C or a crash.
+    """
+
+    def __init__(self, command: str, enabled: bool = True, resume: bool = False):
+        self.command = command
+        self._lock = threading.Lock()
+        journals = sorted(JOURNAL_DIR.glob(f"{command}-*.jsonl"))
+        self.previous = _read(journals[-1]) if journals else {}
+        self._file = None
+        if not enabled:
+            return
+
+        JOURNAL_DIR.mkdir(parents=True, exist_ok=True)
+        for old in journals[:max(len(journals) + 1 - JOURNAL_KEEP, 0)]:
+            old.unlink(missing_ok=True)
+        self.path = JOURNAL_DIR / f"{command}-{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}.jsonl"
+        self._file = open(self.path, "a")
+        self._write({"type": "run", "command": command, "started": time.time()})
+        if not resume:
+            return
+        for record in self.previous.values():
+            if record["state"] != STARTED:
+                self._write(record)
+
+    def _write(self, record: dict) -> None:
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+
+    def finished(self, path) -> bool:
+        """True when the previous run got path to a final state other than failed."""
+        record = self.previous.get(str(path))
+        return record is not None and record["state"] not in (STARTED, FAILED)
+
+    def interrupted(self, path) -> bool:
+        """True when the previous run started path and died before finishing it."""
+        record = self.previous.get(str(path))
+        return record is not None and record["state"] == STARTED and not _alive(record.get("pid"))
+
+    def pending(self, repos: List[Tuple[str, Repo]]) -> List[Tuple[str, Repo]]:
+        """The repos from a selection the previous run did not finish."""
+        return [
+            (group_name, repo)
+            for group_name, repo in repos
+            if not self.finished(repo.path)
+        ]
+
+    def record(self, path, state: str, **fields) -> None:
+        if self._file is None:
+            return
+        record = {"path": str(path), "state": state, "time": time.time()}
+        if state == STARTED:
+            record["pid"] = os.getpid()
+        record.update((key, value) for key, value in fields.items() if value is not None)
+        with self._lock:
+            self._write(record)
+
+    def close(self) -> Optional[Path]:
+        if self._file is None:
+            return None
+        self._file.close()
+        self._file = None
+        return self.path
@@ -0,0 +1,68 @@
+import os
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+from gits.utils.process import run
+from gits.utils.gitmeta import common_dir, git_dir
+
+
+class ObjectStats(NamedTuple):
+    loose: int
+    loose_bytes: int
+    packs: int
+    pack_bytes: int
+    garbage_bytes: int
+    loose_refs: int
+
+    @property
+    def total_bytes(self) -> int:
+        return self.loose_bytes + self.pack_bytes + self.garbage_bytes
+
+
+def _loose_refs(path: Path) -> int:
+    gdir = git_dir(path)
+    if gdir is None:
+        return 0
+    count = 0
+    for _, _, files in os.walk(os.path.join(common_dir(gdir), "refs")):
+        count += len(files)
+    return count
+
+
+def count_objects(path: Path) -> ObjectStats:
+    """Parse ``git count-objects -v`` (sizes are reported in KiB) plus loose ref files."""
+    result = run(
+        ["git", "-C", str(path), "count-objects", "-v"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    values = {}
+    for line in result.stdout.splitlines():
+        key, _, value = line.partition(":")
+        if value.strip().isdigit():
+            values[key.strip()] = int(value)
+    return ObjectStats(
+        loose=values.get("count", 0),
+        loose_bytes=values.get("size", 0) * 1024,
+        packs=values.get("packs", 0),
+        pack_bytes=values.get("size-pack", 0) * 1024,
+        garbage_bytes=values.get("size-garbage", 0) * 1024,
+        loose_refs=_loose_refs(path),
+    )
+
+
+# Commands that rewrite packs and are limited by --io-jobs
+HEAVY_TASKS = ("gc",)
+
+
+def plan_maintenance(stats: ObjectStats, max_loose: int, max_packs: int, max_loose_refs: int) -> Optional[List[str]]:
+    """Return the git arguments that bring stats under the thresholds, or None when healthy.
+
+    gc also packs refs, so pack-refs only runs on its own when objects are fine.
+    """
+    if stats.loose > max_loose or stats.packs > max_packs:
+        return ["gc", "--quiet"]
+    if stats.loose_refs > max_loose_refs:
+        return ["pack-refs", "--all"]
+    return None
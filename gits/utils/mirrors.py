@@ -0,0 +1,58 @@
+import hashlib
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Optional, Tuple
+
+from gits.utils.cache import DATA_DIR
+from gits.utils.process import run
+
+# Not under the cache dir: clones made with --no-dissociate need these to stay
+MIRROR_DIR = Path(os.getenv("GITS_MIRROR_DIR", str(DATA_DIR / "mirrors")))
+
+
+def mirror_path(url: str, mirror_dir: Optional[Path] = None) -> Path:
+    """One bare mirror per unique URL, named for readability plus a URL hash."""
+    name = re.sub(r"[^A-Za-z0-9._-]", "_", url.rstrip("/").rsplit("/", 1)[-1].rsplit(":", 1)[-1])
+    if name.endswith(".git"):
+        name = name[:-4]
+    digest = hashlib.sha1(url.encode()).hexdigest()[:12]
+    return (mirror_dir or MIRROR_DIR) / f"{name}-{digest}.git"
+
+
+def update_mirror(url: str, mirror_dir: Optional[Path] = None, fetch: bool = True) -> Tuple[Path, str]:
+    """Create or refresh the mirror for url; returns (path, action).
+
+    New mirrors are cloned to a temporary name and renamed into place, so an
+    interrupted run never leaves a half-populated mirror behind.
+    """
+    path = mirror_path(url, mirror_dir)
+
+    if path.exists():
+        if not fetch:
+            return path, "cached"
+        run(
+            ["git", "-C", str(path), "remote", "update", "--prune"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return path, "updated"
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}")
+    if tmp.exists():
+        shutil.rmtree(tmp)
+    try:
+        run(
+            ["git", "clone", "--mirror", "-q", url, str(tmp)],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        os.rename(tmp, path)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return path, "created"
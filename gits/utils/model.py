@@ -0,0 +1,104 @@
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from gits.utils.discovery import DEFAULT_DEPTH, DEFAULT_IGNORES
+
+
+def resolve_path(group_name: str, alias: str, target_path: Optional[str]) -> Path:
+    return Path(target_path or f"{Path.home()}/{group_name}/{alias}")
+
+
+class Repo:
+    """One repository entry; its checkout path is resolved once, on first use.
+
+    YAML keys beyond the typed fields (clone options such as depth or
+    sparse) are kept in ``options``; ``get`` reads either, so helpers that
+    take a repository entry work the same on a Repo.
+    """
+
+    __slots__ = ("group_name", "alias", "url", "target_path", "_path", "tags", "do_not_delete", "unlisted", "options")
+
+    FIELDS = ("alias", "url", "target_path", "tags", "do_not_delete", "unlisted")
+
+    def __init__(
+        self,
+        group_name: str,
+        alias: str,
+        url: Optional[str] = None,
+        target_path: Optional[str] = None,
+        tags: Iterable[str] = (),
+        do_not_delete: bool = False,
+        unlisted: bool = False,
+        options: Optional[dict] = None,
+    ):
+        self.group_name = group_name
+        self.alias = alias
+        self.url = url
+        self.target_path = target_path
+        self._path = None
+        self.tags = tuple(tags)
+        self.do_not_delete = do_not_delete
+        self.unlisted = unlisted
+        self.options = options or None
+
+    @classmethod
+    def from_entry(cls, group_name: str, entry: dict) -> "Repo":
+        options = {key: value for key, value in entry.items() if key not in cls.FIELDS}
+        tags = entry.get("tags") or ()
+        return cls(
+            group_name,
+            str(entry["alias"]),
+            entry.get("url"),
+            entry.get("target_path"),
+            (tags,) if isinstance(tags, str) else tags,
+            bool(entry.get("do_not_delete", False)),
+            bool(entry.get("unlisted", False)),
+            options,
+        )
+
+    @property
+    def path(self) -> Path:
+        if self._path is None:
+            self._path = resolve_path(self.group_name, self.alias, self.target_path)
+        return self._path
+
+    def __reduce__(self):
+        return Repo, (self.group_name, self.alias, self.url, self.target_path, self.tags,
+                      self.do_not_delete, self.unlisted, self.options)
+
+    def get(self, key: str, default=None):
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            return default if value is None else value
+        return self.options.get(key, default) if self.options else default
+
+    def __repr__(self) -> str:
+        return f"Repo({self.group_name!r}, {self.alias!r}, path={str(self.path)!r})"
+
+
+class Group:
+    __slots__ = ("name", "root_dir", "discover_depth", "discover_ignore", "tags", "repositories")
+
+    def __init__(
+        self,
+        name: str,
+        root_dir: Optional[str] = None,
+        discover_depth: int = DEFAULT_DEPTH,
+        discover_ignore: Iterable[str] = DEFAULT_IGNORES,
+        tags: Iterable[str] = (),
+        repositories: Optional[List[Repo]] = None,
+    ):
+        self.name = name
+        self.root_dir = root_dir
+        self.discover_depth = discover_depth
+        self.discover_ignore = tuple(discover_ignore)
+        self.tags = tuple(tags)
+        self.repositories = repositories if repositories is not None else []
+
+    def copy(self) -> "Group":
+        """Same group with its own repository list; the Repo records are shared."""
+        return Group(self.name, self.root_dir, self.discover_depth, self.discover_ignore, self.tags,
+                     list(self.repositories))
+
+    def __repr__(self) -> str:
+        return f"Group({self.name!r}, {len(self.repositories)} repositories)"
@@ -0,0 +1,93 @@
+import re
+import subprocess
+import time
+from typing import Callable
+
+from gits.utils import profiler
+
+# git redraws these in place with carriage returns while objects transfer
+_PROGRESS_LINE = re.compile(r"\d+% \(\d+/\d+\)|^remote: (?:Enumerating|Counting|Compressing|Total) ")
+
+
+def _repo_of(args, kwargs):
+    if "cwd" in kwargs and kwargs["cwd"] is not None:
+        return str(kwargs["cwd"])
+    if len(args) > 2 and args[1] == "-C":
+        return str(args[2])
+    if len(args) > 2 and args[1] == "clone":
+        return str(args[-1])
+    return None
+
+
+def _record(args, kwargs, start, exit_code, output_bytes) -> None:
+    argv = [str(arg) for arg in args]
+    name = " ".join(argv[3:5] if len(argv) > 3 and argv[1] == "-C" else argv[:2])
+    profiler.record(
+        name, "process", start, time.perf_counter(),
+        repo=_repo_of(args, kwargs), argv=argv, exit=exit_code, output_bytes=output_bytes,
+    )
+
+
+def run(args, **kwargs) -> subprocess.CompletedProcess:
+    """subprocess.run that records a trace event when --profile is active."""
+    if not profiler.enabled():
+        return subprocess.run(args, **kwargs)
+
+    start = time.perf_counter()
+    exit_code = None
+    output_bytes = 0
+    try:
+        result = subprocess.run(args, **kwargs)
+        exit_code = result.returncode
+        output_bytes = len(result.stdout or "") + len(result.stderr or "")
+        return result
+    except subprocess.CalledProcessError as e:
+        exit_code = e.returncode
+        output_bytes = len(e.stdout or "") + len(e.stderr or "")
+        raise
+    finally:
+        _record(args, kwargs, start, exit_code, output_bytes)
+
+
+def run_progress(args, on_progress: Callable[[str], None], check: bool = False) -> subprocess.CompletedProcess:
+    """Run a git transfer started with --progress, streaming its stderr.
+
+    Each progress update is passed to on_progress as it arrives; the
+    remaining stderr lines are returned as if captured, so error handling
+    sees the same text as with run(). stdout is discarded.
+    """
+    start = time.perf_counter()
+    kept = []
+    output_bytes = 0
+    process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+    def handle(raw: bytes) -> None:
+        line = raw.decode(errors="replace").strip()
+        if not line:
+            return
+        if _PROGRESS_LINE.search(line):
+            on_progress(line)
+        else:
+            kept.append(line)
+
+    pending = b""
+    try:
+        while True:
+            chunk = process.stderr.read1(65536)
+            if not chunk:
+                break
+            output_bytes += len(chunk)
+            *lines, pending = re.split(rb"[\r\n]", pending + chunk)
+            for line in lines:
+                handle(line)
+        handle(pending)
+    finally:
+        process.stderr.close()
+        exit_code = process.wait()
+        if profiler.enabled():
+            _record(args, {}, start, exit_code, output_bytes)
+
+    stderr = "\n".join(kept) + ("\n" if kept else "")
+    if check and exit_code:
+        raise subprocess.CalledProcessError(exit_code, args, "", stderr)
+    return subprocess.CompletedProcess(args, exit_code, "", stderr)
@@ -0,0 +1,81 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+_lock = threading.Lock()
+_events = None
+_origin = 0.0
+
+
+def enable() -> None:
+    global _events, _origin
+    _events = []
+    _origin = time.perf_counter()
+
+
+def enabled() -> bool:
+    return _events is not None
+
+
+def record(name: str, category: str, start: float, end: float, **args) -> None:
+    """Store one complete event; start and end come from time.perf_counter()."""
+    if _events is None:
+        return
+    event = {
+        "name": name,
+        "cat": category,
+        "ph": "X",
+        "ts": round((start - _origin) * 1e6),
+        "dur": round((end - start) * 1e6),
+        "pid": os.getpid(),
+        "tid": threading.get_ident(),
+        "args": args,
+    }
+    with _lock:
+        _events.append(event)
+
+
+@contextmanager
+def span(name: str, **args):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, "gits", start, time.perf_counter(), **args)
+
+
+def write_trace(path: Path) -> None:
+    """Write the Chrome trace-event JSON (load it in chrome://tracing or Perfetto)."""
+    import json
+
+    with open(path, "w") as f:
+        json.dump({"traceEvents": _events or [], "displayTimeUnit": "ms"}, f)
+
+
+def slowest_repos(top: int = 10):
+    """Return [(repo, seconds, processes)] ordered by total subprocess time."""
+    totals = {}
+    for event in _events or []:
+        repo = event["args"].get("repo")
+        if event["cat"] != "process" or not repo:
+            continue
+        seconds, count = totals.get(repo, (0.0, 0))
+        totals[repo] = (seconds + event["dur"] / 1e6, count + 1)
+    ranked = sorted(totals.items(), key=lambda item: item[1][0], reverse=True)
+    return [(repo, seconds, count) for repo, (seconds, count) in ranked[:top]]
+
+
+def finish(path: Optional[Path], top: int = 10, name: str = "gits") -> None:
+    import typer
+    import gits.ui.icons as ICONS
+
+    record(name, "gits", _origin, time.perf_counter())
+    if path:
+        write_trace(path)
+    processes = sum(1 for event in _events or [] if event["cat"] == "process")
+    typer.echo(f"{ICONS.TIME} Profile: {processes} subprocesses" + (f", trace written to {path}" if path else ""), err=True)
+    for repo, seconds, count in slowest_repos(top):
+        typer.echo(f"   {seconds:8.3f}s  {repo} ({count} processes)", err=True)
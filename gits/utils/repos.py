@@ -1,16 +1,36 @@
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, List, Optional, Tuple
 
-from gits.utils.config_loader import load_repos
+from gits.utils.config_loader import iter_groups, load_index
+from gits.utils.model import Group, Repo, resolve_path
+from gits.utils.selector import repo_matches
 
 def get_repo_path(group_name: str, alias: str, target_path: Optional[str]) -> Path:
-    return Path(target_path or f"{Path.home()}/{group_name}/{alias}")
+    return resolve_path(group_name, alias, target_path)
 
-def filtered_repos(repo_group):
-    return [
-        (group["group_name"], repo)
-        for group in load_repos()
-        if not repo_group or group["group_name"] == repo_group
-        for repo in group["repositories"]
-    ]
+def repo_key(repo: Repo) -> str:
+    """Stable per-repository key for caches: the checkout path."""
+    return str(repo.path)
 
+def filtered_repos(repo_group=None, tags=None, aliases=None) -> List[Tuple[str, Repo]]:
+    """(group_name, repo) pairs matching the selectors, in config order.
+
+    Each selector takes comma-separated globs, e.g. ``"editor,hypr*"``; a
+    repository must match every selector that is given.
+    """
+    index = load_index()
+    return [index.entries[position] for position in index.select(repo_group, tags, aliases)]
+
+def iter_repos(repo_group=None, tags=None, aliases=None) -> Iterator[Tuple[str, Repo]]:
+    """filtered_repos as a generator that starts yielding while the config still loads."""
+    for group in iter_groups():
+        for repo in group.repositories:
+            if repo_matches(group, repo, repo_group, tags, aliases):
+                yield group.name, repo
+
+def selected_paths(repo_group=None, tags=None, aliases=None) -> List[str]:
+    return [str(repo.path) for _, repo in filtered_repos(repo_group, tags, aliases)]
+
+def selected_groups(repo_group=None, tags=None, aliases=None) -> List[Tuple[Group, List[Repo]]]:
+    """(group, repos) pairs for commands that work group by group."""
+    return load_index().select_groups(repo_group, tags, aliases)
@@ -0,0 +1,51 @@
+import random
+import subprocess
+import time
+from typing import Callable, Optional
+
+# Lower-cased fragments of git/curl/ssh errors worth another attempt
+TRANSIENT_ERRORS = (
+    "could not resolve host",
+    "temporary failure in name resolution",
+    "connection timed out",
+    "operation timed out",
+    "connection reset",
+    "connection refused",
+    "the remote end hung up unexpectedly",
+    "unexpected disconnect",
+    "early eof",
+    "rpc failed",
+    "returned error: 429",
+    "returned error: 50",
+)
+
+
+def is_transient(error: subprocess.CalledProcessError) -> bool:
+    output = (error.stderr or "").lower()
+    return any(fragment in output for fragment in TRANSIENT_ERRORS)
+
+
+def with_retries(
+    func: Callable,
+    retries: int,
+    backoff: float,
+    on_retry: Optional[Callable[[int, float], None]] = None,
+):
+    """Call func() and retry transient git failures up to retries times.
+
+    The wait doubles after every attempt, starting at backoff seconds, with
+    jitter so parallel workers hitting the same host do not retry in step.
+    on_retry(attempt, delay) runs before each wait.
+    """
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except subprocess.CalledProcessError as e:
+            if attempt >= retries or not is_transient(e):
+                raise
+            delay = backoff * 2 ** attempt * random.uniform(0.75, 1.25)
+            attempt += 1
+            if on_retry:
+                on_retry(attempt, delay)
+            time.sleep(delay)
@@ -0,0 +1,68 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional
+
+import typer
+import gits.ui.icons as ICONS
+
+
+# Clone, pull and mirror updates mostly wait on remotes, so their default does
+# not follow the CPU count; --host-jobs still caps each host
+NETWORK_JOBS = 4
+
+
+def default_jobs() -> int:
+    return os.cpu_count() or 1
+
+
+def run_parallel(items: Iterable, worker: Callable, jobs: Optional[int] = None) -> Iterator:
+    """Run worker(*item) for each item and yield (item, result) in input order.
+
+    items may be a generator: each item is submitted as soon as it is
+    produced, and finished results are yielded while later items load.
+    """
+    jobs = jobs or default_jobs()
+
+    if jobs <= 1:
+        for item in items:
+            item = tuple(item)
+            yield item, worker(*item)
+        return
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        pending = deque()
+        for item in items:
+            item = tuple(item)
+            pending.append((item, executor.submit(worker, *item)))
+            while pending and pending[0][1].done():
+                item, future = pending.popleft()
+                yield item, future.result()
+        while pending:
+            item, future = pending.popleft()
+            yield item, future.result()
+
+
+def echo_grouped(results: Iterable, show_groups: bool, echo: Callable[[str], None] = typer.echo) -> bool:
+    """Print buffered per-repo lines under their group header.
+
+    Workers return a list of lines, or None when the repo was skipped.
+    Returns True when at least one repo reported.
+    """
+    check_group = ""
+    any_output = False
+
+    for (group_name, _repo), lines in results:
+        if group_name != check_group:
+            check_group = group_name
+            if show_groups:
+                echo(f"{ICONS.GROUP} {group_name}")
+
+        if lines is None:
+            continue
+
+        any_output = True
+        for line in lines:
+            echo(line)
+
+    return any_output
@@ -0,0 +1,180 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, Optional
+from urllib.parse import urlsplit
+
+from gits.utils.cache import CACHE_DIR, load_json, save_json
+
+DURATIONS_FILE = CACHE_DIR / "durations.json"
+DURATIONS_VERSION = 1
+# Weight of the latest run when updating a recorded duration
+DURATION_WEIGHT = 0.5
+
+DEFAULT_HOST_JOBS = 4
+# A job this much slower than its recorded duration counts as the host struggling;
+# the absolute margin keeps an up-to-date repo that now needs a fetch from tripping it
+SLOW_FACTOR = 3.0
+SLOW_SECONDS = 5.0
+
+
+def url_host(url: Optional[str]) -> str:
+    """Host part of a git URL; "" for local paths and file:// URLs."""
+    if not url:
+        return ""
+    if "://" in url:
+        return (urlsplit(url).hostname or "").lower()
+    # scp-like syntax: [user@]host:path
+    head, sep, _ = url.partition(":")
+    if sep and "/" not in head:
+        return head.rpartition("@")[2].lower()
+    return ""
+
+
+class DurationHistory:
+    """Smoothed seconds per repository from earlier runs of one command."""
+
+    def __init__(self, command: str):
+        self.command = command
+        data = load_json(DURATIONS_FILE, {})
+        self._durations: Dict[str, float] = data.get(command, {}) if data.get("version") == DURATIONS_VERSION else {}
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    def get(self, key: str) -> Optional[float]:
+        return self._durations.get(key)
+
+    def record(self, key: str, seconds: float) -> None:
+        with self._lock:
+            previous = self._durations.get(key)
+            if previous is not None:
+                seconds = DURATION_WEIGHT * seconds + (1 - DURATION_WEIGHT) * previous
+            self._durations[key] = round(seconds, 3)
+            self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        # Re-read so a concurrent run of another command keeps its entries
+        data = load_json(DURATIONS_FILE, {})
+        if data.get("version") != DURATIONS_VERSION:
+            data = {"version": DURATIONS_VERSION}
+        data[self.command] = self._durations
+        save_json(DURATIONS_FILE, data)
+
+
+class _HostWindow:
+    """Additive-increase, multiplicative-decrease concurrency for one host."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.window = float(limit)
+        self.active = 0
+
+    def free(self) -> bool:
+        return self.active < int(self.window)
+
+    def congested(self) -> None:
+        self.window = max(1.0, self.window / 2)
+
+    def succeeded(self) -> None:
+        self.window = min(float(self.limit), self.window + 1 / self.window)
+
+
+class Scheduler:
+    """Run per-repository jobs under a global cap and an adaptive per-host cap.
+
+    Jobs start longest-first by recorded duration, so a few large
+    repositories do not form the tail of the run; repositories with no
+    history start first because nothing says they are short. A host's
+    concurrency halves when a worker reports a transient failure or a job
+    runs far slower than its history, and grows back by one slot per
+    window of good jobs. Results are still yielded in input order.
+    """
+
+    def __init__(self, jobs: int, host_jobs: int = DEFAULT_HOST_JOBS, history: Optional[DurationHistory] = None):
+        self.jobs = max(1, jobs)
+        self.host_jobs = max(1, host_jobs)
+        self.history = history
+        self.backoffs = 0
+        self._hosts: Dict[str, _HostWindow] = {}
+        self._lock = threading.Lock()
+
+    def _window(self, host: str) -> _HostWindow:
+        window = self._hosts.get(host)
+        if window is None:
+            # "" is local paths and repositories with no remote: no host to spare
+            window = self._hosts[host] = _HostWindow(self.host_jobs if host else self.jobs)
+        return window
+
+    def congested(self, host: str) -> None:
+        """Called by workers that hit a transient failure against host."""
+        with self._lock:
+            self._window(host).congested()
+            self.backoffs += 1
+
+    def _finished(self, host: str, key: Optional[str], seconds: float) -> None:
+        with self._lock:
+            window = self._window(host)
+            window.active -= 1
+            expected = self.history.get(key) if self.history and key else None
+            if expected is not None and seconds > max(expected * SLOW_FACTOR, expected + SLOW_SECONDS):
+                window.congested()
+                self.backoffs += 1
+            else:
+                window.succeeded()
+        if self.history and key:
+            self.history.record(key, seconds)
+
+    def run(
+        self,
+        items: Iterable,
+        worker: Callable,
+        host_of: Callable[..., str],
+        key_of: Optional[Callable[..., str]] = None,
+    ) -> Iterator:
+        """Run worker(*item) for each item and yield (item, result) in input order."""
+        items = [tuple(item) for item in items]
+        hosts = [host_of(*item) for item in items]
+        keys = [key_of(*item) if key_of else None for item in items]
+
+        def cost(index):
+            known = self.history.get(keys[index]) if self.history and keys[index] else None
+            return float("inf") if known is None else known
+
+        queues: Dict[str, deque] = {}
+        for index in sorted(range(len(items)), key=lambda index: -cost(index)):
+            queues.setdefault(hosts[index], deque()).append(index)
+
+        def timed(index):
+            start = time.perf_counter()
+            try:
+                return worker(*items[index])
+            finally:
+                self._finished(hosts[index], keys[index], time.perf_counter() - start)
+
+        results = {}
+        next_out = 0
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            while queues or running:
+                with self._lock:
+                    while len(running) < self.jobs:
+                        # Longest remaining job among hosts with a free slot
+                        ready = [host for host, queue in queues.items() if self._window(host).free()]
+                        if not ready:
+                            break
+                        host = max(ready, key=lambda host: cost(queues[host][0]))
+                        index = queues[host].popleft()
+                        if not queues[host]:
+                            del queues[host]
+                        self._window(host).active += 1
+                        running[executor.submit(timed, index)] = index
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future)] = future
+                while next_out in results:
+                    yield items[next_out], results.pop(next_out).result()
+                    next_out += 1
@@ -0,0 +1,104 @@
+from fnmatch import fnmatchcase
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+from gits.utils.model import Group, Repo
+
+GLOB_CHARS = set("*?[")
+
+
+def parse_patterns(values) -> List[str]:
+    """Split option values like ``"editor,hypr*"`` or ``["work", "home"]`` into patterns."""
+    if not values:
+        return []
+    if isinstance(values, str):
+        values = [values]
+    return [part.strip() for value in values for part in value.split(",") if part.strip()]
+
+
+def repo_tags(group: Group, repo: Repo) -> Set[str]:
+    return set(group.tags) | set(repo.tags)
+
+
+def _any_match(values: Iterable[str], patterns: List[str]) -> bool:
+    return any(fnmatchcase(value, pattern) for value in values for pattern in patterns)
+
+
+def repo_matches(group: Group, repo: Repo, groups=None, tags=None, aliases=None) -> bool:
+    """The same test as RepoIndex.select, for one repository at a time."""
+    for values, selector in (((group.name,), groups), (repo_tags(group, repo), tags), ((repo.alias,), aliases)):
+        patterns = parse_patterns(selector)
+        if patterns and not _any_match(values, patterns):
+            return False
+    return True
+
+
+class RepoIndex:
+    """Repositories in config order, with lookup tables by group, tag and alias.
+
+    Built once per config change and cached with it, so a selection only
+    touches the keys that match instead of every repository.
+    """
+
+    def __init__(self, groups: Sequence[Group]):
+        self.groups: Dict[str, Group] = {}
+        self.entries: List[Tuple[str, Repo]] = []
+        self.by_group: Dict[str, List[int]] = {}
+        self.by_tag: Dict[str, List[int]] = {}
+        self.by_alias: Dict[str, List[int]] = {}
+
+        for group in groups:
+            group_name = group.name
+            self.groups[group_name] = group
+            self.by_group.setdefault(group_name, [])
+            for repo in group.repositories:
+                position = len(self.entries)
+                self.entries.append((group_name, repo))
+                self.by_group[group_name].append(position)
+                self.by_alias.setdefault(repo.alias, []).append(position)
+                for tag in repo_tags(group, repo):
+                    self.by_tag.setdefault(tag, []).append(position)
+
+    @staticmethod
+    def _match(table: Dict[str, List[int]], patterns: Iterable[str]) -> Set[int]:
+        positions = set()
+        for pattern in patterns:
+            if GLOB_CHARS.isdisjoint(pattern):
+                positions.update(table.get(pattern, ()))
+            else:
+                for key, found in table.items():
+                    if fnmatchcase(key, pattern):
+                        positions.update(found)
+        return positions
+
+    def select(self, groups=None, tags=None, aliases=None) -> List[int]:
+        """Positions matching every given selector; patterns within one selector are alternatives."""
+        selected = None
+        for table, values in ((self.by_group, groups), (self.by_tag, tags), (self.by_alias, aliases)):
+            patterns = parse_patterns(values)
+            if not patterns:
+                continue
+            found = self._match(table, patterns)
+            selected = found if selected is None else selected & found
+        if selected is None:
+            return list(range(len(self.entries)))
+        return sorted(selected)
+
+    def select_groups(self, groups=None, tags=None, aliases=None) -> List[Tuple[Group, List[Repo]]]:
+        """(group, selected repos) in config order.
+
+        Groups without selected repositories are kept only when no tag or alias
+        selector narrows the repositories, so empty groups still list.
+        """
+        patterns = parse_patterns(groups)
+        selected = {}
+        for position in self.select(groups, tags, aliases):
+            group_name, repo = self.entries[position]
+            selected.setdefault(group_name, []).append(repo)
+
+        narrowed = bool(parse_patterns(tags) or parse_patterns(aliases))
+        return [
+            (group, selected.get(name, []))
+            for name, group in self.groups.items()
+            if (not patterns or any(fnmatchcase(name, pattern) for pattern in patterns))
+            and (selected.get(name) or not narrowed)
+        ]
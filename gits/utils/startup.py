@@ -0,0 +1,45 @@
+import subprocess
+import sys
+import time
+
+import typer
+import gits.ui.icons as ICONS
+
+
+def _parse_importtime(stderr: str):
+    """Yield (self_us, cumulative_us, depth, module) from ``-X importtime`` output."""
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        yield int(fields[0]), int(fields[1]), depth, name.strip()
+
+
+def profile_startup(top: int = 15) -> None:
+    """Re-run this gits invocation under ``-X importtime`` and summarize it."""
+    args = [arg for arg in sys.argv[1:] if arg != "--startup-profile"]
+    cmd = [sys.executable, "-X", "importtime", "-m", "gits.main", *args]
+
+    start = time.perf_counter()
+    result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    imports = list(_parse_importtime(result.stderr))
+    import_ms = sum(self_us for self_us, _, _, _ in imports) / 1000
+    roots = sorted((i for i in imports if i[2] == 0), key=lambda i: i[1], reverse=True)
+    slowest = sorted(imports, key=lambda i: i[0], reverse=True)
+
+    typer.echo(f"{ICONS.TIME} gits {' '.join(args)}".rstrip())
+    typer.echo(f"   {ICONS.INFO} Wall time: {wall_ms:.1f} ms (imports {import_ms:.1f} ms, {len(imports)} modules)")
+
+    typer.echo(f"{ICONS.GROUP} Top-level imports (cumulative)")
+    for _, cumulative, _, name in roots[:top]:
+        typer.echo(f"   {cumulative / 1000:8.1f} ms  {name}")
+
+    typer.echo(f"{ICONS.GROUP} Slowest modules (self)")
+    for self_us, _, _, name in slowest[:top]:
+        typer.echo(f"   {self_us / 1000:8.1f} ms  {name}")
@@ -0,0 +1,190 @@
+import hashlib
+import os
+import stat
+import threading
+from dataclasses import asdict
+from pathlib import Path
+from typing import Callable, Optional
+
+from gits.utils.cache import CACHE_DIR, load_json, save_json
+from gits.utils.git_status import RepoStatus
+from gits.utils.gitmeta import common_dir, git_dir, index_entries, read_head, ref_path, upstream
+
+STATUS_CACHE_FILE = CACHE_DIR / "status.json"
+CACHE_VERSION = 3
+# Above this index size (about 1500 tracked files) the stat pass costs about as
+# much as the git status it would save, so larger repositories are never cached
+CACHE_MAX_INDEX_BYTES = 128 << 10
+
+# Files whose stat changes whenever git's view of the repository changes
+FINGERPRINT_FILES = ("index", "HEAD", "FETCH_HEAD")
+# Shared between linked worktrees, so they live in the common git dir
+FINGERPRINT_SHARED_FILES = ("packed-refs", "refs/stash", "config")
+# Index mode of a submodule entry; git checks those by their own HEAD
+GITLINK = 0o160000
+
+
+def _stat_key(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size, st.st_ino]
+
+
+def _unchanged(st: os.stat_result, mtime: int, size: int, mode: int, index_mtime: int) -> bool:
+    """Whether a worktree file still matches its index entry, as git's stat check sees it."""
+    if mtime >= index_mtime or st.st_size & 0xFFFFFFFF != size:
+        return False
+    if mtime % 1_000_000_000:
+        if st.st_mtime_ns != mtime:
+            return False
+    elif st.st_mtime_ns // 1_000_000_000 != mtime // 1_000_000_000:
+        # The index was written without nanosecond timestamps
+        return False
+    if stat.S_ISLNK(mode):
+        return stat.S_ISLNK(st.st_mode)
+    return stat.S_ISREG(st.st_mode) and bool(st.st_mode & 0o100) == bool(mode & 0o100)
+
+
+def _tracked_changes(repo_path: Path, gdir: str) -> Optional[list]:
+    """Digest of the tracked files whose stat no longer matches their index entry,
+    and the newest mtime of the directories holding tracked files.
+
+    Clean files add nothing, so the digest only moves when a tracked file is
+    edited, removed or changes type. Entries at least as new as the index
+    itself are racily clean, and git would re-read them; they always count.
+    Directory mtimes catch untracked files appearing next to tracked ones;
+    untracked and ignored trees are never entered.
+    """
+    entries = index_entries(gdir)
+    if entries is None:
+        return None
+    try:
+        index_mtime = os.stat(os.path.join(gdir, "index")).st_mtime_ns
+    except OSError:
+        index_mtime = 0
+
+    prefix = os.path.join(repo_path, "")
+    lstat = os.lstat
+    changed = []
+    dirs = {""}
+    for name, mtime, size, mode in entries:
+        parent = name.rpartition("/")[0]
+        while parent not in dirs:
+            dirs.add(parent)
+            parent = parent.rpartition("/")[0]
+        try:
+            st = lstat(prefix + name)
+        except OSError:
+            if stat.S_IFMT(mode) != GITLINK:
+                changed.append((name,))
+            continue
+        if st.st_mtime_ns == mtime and st.st_size == size and st.st_mode == mode and mtime < index_mtime:
+            continue
+        if stat.S_IFMT(mode) == GITLINK or _unchanged(st, mtime, size, mode, index_mtime):
+            continue
+        changed.append((name, st.st_mtime_ns, st.st_size, st.st_mode))
+
+    newest = 0
+    for name in dirs:
+        try:
+            newest = max(newest, lstat(prefix + name).st_mtime_ns)
+        except OSError:
+            continue
+    return [hashlib.sha1(repr(changed).encode()).hexdigest() if changed else "", newest]
+
+
+def _index_size(gdir: str) -> int:
+    try:
+        return os.stat(os.path.join(gdir, "index")).st_size
+    except OSError:
+        return 0
+
+
+def _upstream_ref(gdir: str) -> Optional[str]:
+    branch, _ = read_head(gdir)
+    tracking = upstream(gdir, branch)
+    if tracking is None or not tracking[1].startswith("refs/heads/"):
+        return None
+    remote, merge, _ = tracking
+    return f"refs/remotes/{remote}/{merge[len('refs/heads/'):]}"
+
+
+def fingerprint(repo_path: Path) -> Optional[list]:
+    gdir = git_dir(repo_path)
+    if gdir is None:
+        return None
+
+    shared = common_dir(gdir)
+    keys = [_stat_key(os.path.join(gdir, name)) for name in FINGERPRINT_FILES]
+    keys += [_stat_key(os.path.join(shared, name)) for name in FINGERPRINT_SHARED_FILES]
+
+    # The checked-out branch ref moves on commit, even when the index does not
+    try:
+        with open(os.path.join(gdir, "HEAD"), "r") as f:
+            head = f.readline().strip()
+    except OSError:
+        head = ""
+    if head.startswith("ref: "):
+        keys.append(_stat_key(ref_path(gdir, head[5:])))
+
+    # A push moves the remote-tracking ref without touching anything above
+    tracking = _upstream_ref(gdir)
+    if tracking:
+        keys.append(_stat_key(ref_path(gdir, tracking)))
+
+    changes = _tracked_changes(repo_path, gdir)
+    if changes is None:
+        return None
+    return keys + changes
+
+
+class StatusCache:
+    """On-disk cache of RepoStatus results keyed by a repository fingerprint."""
+
+    def __init__(self, enabled: bool = True, refresh: bool = False):
+        self.enabled = enabled
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._dirty = False
+
+        if enabled:
+            data = load_json(STATUS_CACHE_FILE, {})
+            if data.get("version") == CACHE_VERSION:
+                self._entries = data.get("repos", {})
+
+    def lookup(self, path: Path, compute: Callable[[Path], RepoStatus]) -> RepoStatus:
+        """Return the cached status for path, or compute and remember it."""
+        if not self.enabled:
+            return compute(path)
+
+        # Large repositories go straight to git; see CACHE_MAX_INDEX_BYTES
+        gdir = git_dir(path)
+        if gdir is not None and _index_size(gdir) > CACHE_MAX_INDEX_BYTES:
+            return compute(path)
+
+        key = str(path)
+        # Fingerprint before running git so a change during the run forces a miss next time
+        current = fingerprint(path)
+        entry = self._entries.get(key)
+
+        if not self.refresh and current is not None and entry and entry["fingerprint"] == current:
+            with self._lock:
+                self.hits += 1
+            return RepoStatus(**entry["status"])
+
+        result = compute(path)
+        with self._lock:
+            self.misses += 1
+            if current is not None:
+                self._entries[key] = {"fingerprint": current, "status": asdict(result)}
+                self._dirty = True
+        return result
+
+    def save(self) -> None:
+        if self.enabled and self._dirty:
+            save_json(STATUS_CACHE_FILE, {"version": CACHE_VERSION, "repos": self._entries})
@@ -0,0 +1,186 @@
+import errno
+import os
+import stat
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from gits.utils.cache import DATA_DIR, load_json, save_json
+
+TRASH_DIR = DATA_DIR / "trash"
+TRASH_DIRS_FILE = DATA_DIR / "trash_dirs.json"
+LOCK_FILE = DATA_DIR / "trash.lock"
+
+# Directories this shallow are split into independent subtrees for the pool
+SPLIT_DEPTH = 2
+
+
+def _mount_point(path: Path) -> Path:
+    path = path.resolve()
+    dev = path.stat().st_dev
+    while path.parent != path and path.parent.stat().st_dev == dev:
+        path = path.parent
+    return path
+
+
+def _trash_dir_for(path: Path) -> Optional[Path]:
+    """Return a trash directory on the same filesystem as path, or None."""
+    TRASH_DIR.mkdir(parents=True, exist_ok=True)
+    dev = path.lstat().st_dev
+    if TRASH_DIR.stat().st_dev == dev:
+        return TRASH_DIR
+
+    # Different filesystem: use a per-user trash at its mount point, like $topdir/.Trash-$uid
+    trash = _mount_point(path) / f".gits-trash-{os.getuid()}"
+    try:
+        trash.mkdir(mode=0o700, exist_ok=True)
+    except OSError:
+        return None
+
+    known = trash_dirs()
+    if str(trash) not in known:
+        save_json(TRASH_DIRS_FILE, [*known, str(trash)])
+    return trash
+
+
+def trash_dirs() -> List[str]:
+    return [str(TRASH_DIR), *[d for d in load_json(TRASH_DIRS_FILE, []) if d != str(TRASH_DIR)]]
+
+
+def move_to_trash(path: Path) -> Optional[Path]:
+    """Atomically rename path into a trash dir on its filesystem.
+
+    Returns the new location, or None when no same-filesystem trash is usable.
+    """
+    trash = _trash_dir_for(path)
+    if trash is None:
+        return None
+
+    target = trash / f"{time.time_ns()}-{os.getpid()}-{path.name}"
+    try:
+        os.rename(path, target)
+    except OSError as e:
+        if e.errno == errno.EXDEV:
+            return None
+        raise
+    return target
+
+
+def _unlink(path: str) -> None:
+    try:
+        os.unlink(path)
+    except PermissionError:
+        # Read-only parent directories (e.g. Go module caches) block unlink
+        parent = os.path.dirname(path)
+        os.chmod(parent, os.stat(parent).st_mode | stat.S_IWUSR | stat.S_IXUSR)
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _rmdir(path: str) -> None:
+    try:
+        os.rmdir(path)
+    except FileNotFoundError:
+        pass
+
+
+def _remove_dir(path: str) -> None:
+    try:
+        os.chmod(path, os.stat(path).st_mode | stat.S_IWUSR | stat.S_IXUSR | stat.S_IRUSR)
+        entries = list(os.scandir(path))
+    except FileNotFoundError:
+        return
+
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            _remove_dir(entry.path)
+        else:
+            _unlink(entry.path)
+    _rmdir(path)
+
+
+def remove_tree(root: str, executor: ThreadPoolExecutor) -> None:
+    """Remove root, handing its subtrees below SPLIT_DEPTH to the executor."""
+    if not os.path.isdir(root) or os.path.islink(root):
+        _unlink(root)
+        return
+
+    shallow_dirs, shallow_files = [], []
+    level = [root]
+    for _ in range(SPLIT_DEPTH):
+        next_level = []
+        for directory in level:
+            shallow_dirs.append(directory)
+            try:
+                os.chmod(directory, os.stat(directory).st_mode | stat.S_IWUSR | stat.S_IXUSR | stat.S_IRUSR)
+                entries = list(os.scandir(directory))
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    next_level.append(entry.path)
+                else:
+                    shallow_files.append(entry.path)
+        level = next_level
+
+    list(executor.map(_remove_dir, level))
+    list(executor.map(_unlink, shallow_files))
+    for directory in reversed(shallow_dirs):
+        _rmdir(directory)
+
+
+def purge(jobs: Optional[int] = None, on_wait: Optional[Callable[[], None]] = None) -> int:
+    """Remove everything in every known trash dir; returns entries removed.
+
+    Holds an exclusive lock so a background purge and `gits delete --purge`
+    never race. Without on_wait a purge that finds the lock taken returns 0
+    at once; with it, on_wait is called and the purge waits its turn, then
+    removes whatever the other one left. Entries left by an interrupted
+    purge are picked up next time.
+    """
+    import fcntl
+
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    with open(LOCK_FILE, "w") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            if on_wait is None:
+                return 0
+            on_wait()
+            fcntl.flock(lock, fcntl.LOCK_EX)
+
+        removed = 0
+        with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as executor:
+            # Loop until empty: deletes may keep adding entries while we purge
+            while True:
+                entries = [
+                    entry.path
+                    for trash in trash_dirs()
+                    if os.path.isdir(trash)
+                    for entry in os.scandir(trash)
+                ]
+                if not entries:
+                    return removed
+                for entry in entries:
+                    remove_tree(entry, executor)
+                    removed += 1
+
+
+def purge_in_background() -> None:
+    """Start a detached purge that outlives this gits process."""
+    subprocess.Popen(
+        [sys.executable, "-m", "gits.utils.trash"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+if __name__ == "__main__":
+    purge()
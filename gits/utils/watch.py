@@ -0,0 +1,218 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from gits.utils.gitmeta import common_dir, git_dir
+from gits.utils.status_cache import fingerprint
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+)
+EVENT_HEADER = struct.Struct("iIII")
+
+# Repos needing more directory watches than this are polled instead
+MAX_WATCHES_PER_REPO = 2000
+
+
+class Inotify:
+    """Minimal ctypes binding for Linux inotify."""
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError("libc not found")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify not supported")
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, path: str, mask: int = WATCH_MASK) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+        return wd
+
+    def read_events(self, timeout: float) -> Iterable[Tuple[int, int, str]]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class RepoWatcher:
+    """Call on_change(repo) whenever something under a watched repository changes.
+
+    Each repository's git dir, refs and worktree directories are watched with
+    inotify. Repositories too large to watch, or every repository when inotify
+    is unavailable, are polled by fingerprint every poll_interval seconds.
+    """
+
+    def __init__(self, on_change: Callable[[str], None], poll_interval: float = 2.0, use_inotify: bool = True):
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watches: Dict[int, Tuple[str, str]] = {}
+        self._polled: Dict[str, Optional[list]] = {}
+        self._repos = set()
+        self.inotify = None
+        if use_inotify:
+            try:
+                self.inotify = Inotify()
+            except (OSError, AttributeError):
+                self.inotify = None
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if self.inotify else "poll"
+
+    def add(self, repo: str) -> None:
+        with self._lock:
+            if repo in self._repos:
+                return
+            self._repos.add(repo)
+        if self.inotify and self._watch_repo(repo):
+            return
+        with self._lock:
+            self._polled[repo] = fingerprint(repo)
+
+    def discard(self, repo: str) -> None:
+        """Stop reporting repo; its inotify watches disappear with the directory."""
+        with self._lock:
+            self._repos.discard(repo)
+            self._polled.pop(repo, None)
+
+    def _watch_repo(self, repo: str) -> bool:
+        gdir = git_dir(repo)
+        if gdir is None:
+            return False
+
+        shared = common_dir(gdir)
+        dirs = [gdir] if shared == gdir else [gdir, shared]
+        for sub in ("refs", "refs/heads", "refs/remotes"):
+            if os.path.isdir(os.path.join(shared, sub)):
+                dirs.append(os.path.join(shared, sub))
+        remotes = os.path.join(shared, "refs", "remotes")
+        if os.path.isdir(remotes):
+            dirs += [entry.path for entry in os.scandir(remotes) if entry.is_dir()]
+
+        for dirpath, dirnames, _ in os.walk(repo):
+            if ".git" in dirnames:
+                dirnames.remove(".git")
+            dirs.append(dirpath)
+            if len(dirs) > MAX_WATCHES_PER_REPO:
+                return False
+
+        try:
+            added = [(self.inotify.add_watch(d), d) for d in dirs]
+        except OSError:
+            return False
+        with self._lock:
+            for wd, d in added:
+                self._watches[wd] = (repo, d)
+        return True
+
+    def run(self) -> None:
+        last_poll = time.monotonic()
+        while not self._stop.is_set():
+            if self.inotify:
+                for wd, mask, name in self.inotify.read_events(0.5):
+                    self._handle(wd, mask, name)
+            else:
+                self._stop.wait(0.5)
+
+            if time.monotonic() - last_poll >= self.poll_interval:
+                last_poll = time.monotonic()
+                self._poll()
+
+        if self.inotify:
+            self.inotify.close()
+
+    def _handle(self, wd: int, mask: int, name: str) -> None:
+        if mask & IN_Q_OVERFLOW:
+            # Events were dropped; treat every repository as changed
+            with self._lock:
+                repos = list(self._repos)
+            for repo in repos:
+                self.on_change(repo)
+            return
+
+        with self._lock:
+            target = self._watches.get(wd)
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+        if target is None:
+            return
+
+        repo, directory = target
+        if repo not in self._repos or name.endswith(".lock"):
+            return
+        if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and name != ".git":
+            # New directories in the worktree need their own watch
+            try:
+                new_dir = os.path.join(directory, name)
+                wd = self.inotify.add_watch(new_dir)
+                with self._lock:
+                    self._watches[wd] = (repo, new_dir)
+            except OSError:
+                pass
+        self.on_change(repo)
+
+    def _poll(self) -> None:
+        with self._lock:
+            polled = dict(self._polled)
+        for repo, previous in polled.items():
+            current = fingerprint(repo)
+            if current != previous:
+                with self._lock:
+                    self._polled[repo] = current
+                self.on_change(repo)
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "watched": len(self._repos) - len(self._polled),
+                "polled": len(self._polled),
+                "watches": len(self._watches),
+            }
+
+    def stop(self) -> None:
+        self._stop.set()